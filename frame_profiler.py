@@ -0,0 +1,200 @@
+import csv
+import json
+import statistics
+import time
+from array import array
+
+# Opt-in frame profiler shared by the pygame games (tetris_game.py, voice_bird).
+# It needs no numpy, and pygame only for ProfilerHUD.
+# The game loop calls begin() at the top of every frame and mark(phase) after each
+# part of it; a phase's time is the time since the previous mark, so the phases add
+# up to the whole frame:
+#
+#   profiler.begin()
+#   clock.tick(FPS);      profiler.mark('wait')
+#   ...events...          profiler.mark('event')
+#   ...simulation...      profiler.mark('sim')
+#   ...drawing...         profiler.mark('render')
+#   pygame.display.flip(); profiler.mark('flip')
+#
+# Frames that skip a phase (paused, game over) record 0 for it. Games may add value
+# columns of their own (e.g. audio queue depth) and set them with record(). Every
+# frame is one row of float arrays, a few dozen bytes per frame, so a session can
+# be written out whole as a CSV or JSON trace; report() prints p50/p95/p99 per
+# column at exit. ProfilerHUD draws the recent phase split against the frame budget.
+
+PHASES = ('wait', 'event', 'sim', 'render', 'flip')
+PHASE_COLORS = {
+    'wait': (90, 90, 90),
+    'audio': (0, 160, 160),
+    'event': (160, 80, 200),
+    'sim': (40, 120, 230),
+    'render': (230, 140, 0),
+    'flip': (220, 40, 40),
+}
+
+
+def percentiles(values, points=(50, 95, 99)):
+    """Linearly interpolated percentiles of a sequence (same as numpy's default)"""
+    if len(values) < 2:
+        return [float(values[0]) if len(values) else 0.0] * len(points)
+    cuts = statistics.quantiles(values, n=100, method='inclusive')
+    return [cuts[point - 1] for point in points]
+
+
+class FrameProfiler:
+    """Per-frame phase timings (ms) and game-specific values in growing float arrays"""
+
+    def __init__(self, phases=PHASES, values=(), fps=60):
+        self.phases = tuple(phases)
+        self.values = tuple(values)
+        self.columns = (('time_s', 'frame_ms') + tuple(f"{phase}_ms" for phase in self.phases)
+                        + self.values)
+        self.index = {name: i for i, name in enumerate(self.columns)}
+        self.data = [array('d') for _ in self.columns]
+        self.budget_ms = 1000 / fps if fps else None
+        self.row = [0.0] * len(self.columns)
+        self.start = self.frame_start = self.last = None
+
+    def begin(self):
+        """Close the previous frame and start timing a new one"""
+        now = time.perf_counter()
+        if self.frame_start is None:
+            self.start = now
+        else:
+            self._close(now)
+        self.frame_start = self.last = now
+        self.row[0] = now - self.start
+
+    def mark(self, phase):
+        """Add the time since the previous mark to phase"""
+        now = time.perf_counter()
+        self.row[self.index[f"{phase}_ms"]] += (now - self.last) * 1000
+        self.last = now
+
+    def record(self, name, value):
+        """Set a value column for the current frame"""
+        self.row[self.index[name]] = value
+
+    def _close(self, now):
+        row = self.row
+        row[1] = (now - self.frame_start) * 1000
+        for column, value in zip(self.data, row):
+            column.append(value)
+        for i in range(1, len(row)):
+            row[i] = 0.0
+
+    def finish(self):
+        """Close the frame in progress (call once the loop has ended)"""
+        if self.frame_start is not None:
+            self._close(time.perf_counter())
+            self.frame_start = None
+
+    @property
+    def frames(self):
+        return len(self.data[0])
+
+    def recent(self, count):
+        """Mean of each phase over the last count frames, in milliseconds"""
+        count = min(count, self.frames)
+        if not count:
+            return {}
+        return {phase: sum(self.data[self.index[f"{phase}_ms"]][-count:]) / count
+                for phase in self.phases}
+
+    def summary(self):
+        """p50/p95/p99, mean and max of every column except the timestamp"""
+        result = {'frames': self.frames, 'budget_ms': self.budget_ms}
+        if not self.frames:
+            return result
+        for name, column in zip(self.columns[1:], self.data[1:]):
+            p50, p95, p99 = percentiles(column)
+            result[name] = {'mean': sum(column) / len(column), 'p50': p50, 'p95': p95,
+                            'p99': p99, 'max': max(column)}
+        if self.budget_ms:
+            over = sum(1 for ms in self.data[1] if ms > self.budget_ms * 1.5)
+            result['over_budget_frames'] = over
+        return result
+
+    def report(self):
+        """Print the summary, one line per column"""
+        summary = self.summary()
+        if not self.frames:
+            return summary
+        budget = f", budget {self.budget_ms:.1f} ms" if self.budget_ms else ""
+        print(f"📊 Frame profile: {self.frames} frames{budget} (mean / p50 / p95 / p99 / max)")
+        for name in self.columns[1:]:
+            stats = summary[name]
+            print(f"📊   {name:<14} {stats['mean']:8.2f} {stats['p50']:8.2f} {stats['p95']:8.2f} "
+                  f"{stats['p99']:8.2f} {stats['max']:8.2f}")
+        if 'over_budget_frames' in summary:
+            print(f"📊   {summary['over_budget_frames']} frames took more than 1.5x the budget")
+        return summary
+
+    def save(self, path):
+        """Write every frame as CSV, or as JSON (columns, frames, summary) for a .json path"""
+        rows = zip(*self.data)
+        if path.endswith('.json'):
+            with open(path, 'w') as f:
+                json.dump({'columns': self.columns, 'frames': [list(row) for row in rows],
+                           'summary': self.summary()}, f)
+        else:
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(self.columns)
+                writer.writerows(rows)
+        print(f"📊 Frame trace saved: {path} ({self.frames} frames)")
+
+
+class ProfilerHUD:
+    """Overlay with the recent split of the frame time as a stacked bar against the
+    budget; the labels are re-rendered only every `refresh` frames"""
+
+    def __init__(self, profiler, font, position=(10, 10), width=240, window=60, refresh=30):
+        import pygame
+
+        self.pygame = pygame
+        self.profiler = profiler
+        self.font = font
+        self.width = width
+        self.window = window
+        self.refresh = refresh
+        self.line_height = font.get_linesize()
+        lines = len(profiler.phases) + 1
+        self.rect = pygame.Rect(position, (width, 18 + lines * self.line_height))
+        self.panel = pygame.Surface(self.rect.size)
+        self.means = {}
+        self.updated = -refresh
+
+    def _render(self):
+        pygame = self.pygame
+        self.means = self.profiler.recent(self.window)
+        panel = self.panel
+        panel.fill((0, 0, 0))
+        total = sum(self.means.values())
+        budget = self.profiler.budget_ms or total or 1.0
+        scale = self.width / max(budget, total, 1e-9)
+        x = 0
+        for phase in self.profiler.phases:
+            w = int(self.means.get(phase, 0.0) * scale)
+            pygame.draw.rect(panel, PHASE_COLORS.get(phase, (200, 200, 200)), (x, 0, w, 12))
+            x += w
+        if self.profiler.budget_ms:
+            bx = min(self.width - 1, int(self.profiler.budget_ms * scale))
+            pygame.draw.line(panel, (255, 255, 255), (bx, 0), (bx, 14), 1)
+        lines = [f"frame {total:5.2f} ms"]
+        colors = [(255, 255, 255)]
+        for phase in self.profiler.phases:
+            lines.append(f"{phase:<7}{self.means.get(phase, 0.0):6.2f} ms")
+            colors.append(PHASE_COLORS.get(phase, (200, 200, 200)))
+        for i, (line, color) in enumerate(zip(lines, colors)):
+            panel.blit(self.font.render(line, True, color), (0, 18 + i * self.line_height))
+
+    def draw(self, screen):
+        """Blit the overlay; returns its rectangle for partial display updates"""
+        frames = self.profiler.frames
+        if frames - self.updated >= self.refresh:
+            self._render()
+            self.updated = frames
+        screen.blit(self.panel, self.rect)
+        return self.rect
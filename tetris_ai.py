@@ -0,0 +1,291 @@
+import argparse
+import json
+import statistics
+import time
+from collections import OrderedDict
+
+from tetris_game import (
+    GRID_WIDTH, GRID_HEIGHT, BLACK, FULL_ROW, SHAPE_CELLS, SHAPE_MASKS, SHAPE_BOUNDS,
+    SHAPE_LOWEST, LEFT, RIGHT, ROTATE, HARD_DROP, BitboardTetris
+)
+
+# 俄罗斯方块自动玩家: 枚举当前方块和下一个方块所有可达的旋转和列,
+# 用高度、空洞、凹凸度和消行数给落点打分。
+# 搜索直接在位棋盘(每行一个整数)上进行, 评估过的棋盘放在LRU缓存里, 键是整个棋盘
+# 打包成的一个整数, 值只含整数和元组。上一步搜索第二层时评估过的棋盘, 在下一步
+# 搜索第一层时可以直接命中, 所以缓存只需容纳一两步的棋盘: 大缓存的命中率并不更高,
+# 反而会在扩容和垃圾回收时让个别步骤卡上十几毫秒。
+# budget_ms 是每步搜索的软目标, 不是硬上限: 第一层的全部落点和其中最好的一个
+# 的第二层总会算完, 只有其余落点的第二层在预计(按上一次展开的耗时)会超出预算时
+# 才跳过, 所以个别步骤仍会超时, main() 输出的 max_ms_per_move 就是实测的最坏值。
+# 限时会让结果随机器快慢变化, budget_ms=0 关闭限时, 同一种子的对局就完全可重复。
+
+# 启发式权重(高度、消行、空洞、凹凸度)
+DEFAULT_WEIGHTS = (-0.510066, 0.760666, -0.35663, -0.184483)
+
+
+def _highest_cells(cells):
+    highest = {}
+    for i, j in cells:
+        highest[j] = min(highest.get(j, i), i)
+    return tuple(sorted(highest.items()))
+
+# SHAPE_HIGHEST[形状序号][旋转] -> ((列, 该列最高行), ...), 用于增量更新列高
+SHAPE_HIGHEST = [[_highest_cells(cells) for cells in shape] for shape in SHAPE_CELLS]
+
+
+def board_rows(tetris):
+    # BitboardTetris 直接使用它的行掩码, 普通 Tetris 从颜色网格转换
+    if isinstance(tetris, BitboardTetris):
+        return tetris.rows
+    return [sum(1 << x for x, cell in enumerate(row) if cell != BLACK) for row in tetris.grid]
+
+
+def column_tops(rows):
+    # 每列最高的占用格所在行, 空列为 GRID_HEIGHT
+    tops = [GRID_HEIGHT] * GRID_WIDTH
+    seen = 0
+    for y, row in enumerate(rows):
+        if not row:
+            continue
+        new = row & ~seen
+        while new:
+            low = new & -new
+            tops[low.bit_length() - 1] = y
+            new ^= low
+        seen |= row
+        if seen == FULL_ROW:
+            break
+    return tops
+
+
+def fits(rows, shape_id, rotation, x, y):
+    _, min_col, max_row, max_col = SHAPE_BOUNDS[shape_id][rotation]
+    if x + min_col < 0 or x + max_col >= GRID_WIDTH or y + max_row >= GRID_HEIGHT:
+        return False
+    for i, mask in SHAPE_MASKS[shape_id][rotation]:
+        row_y = y + i
+        if row_y >= 0 and rows[row_y] & (mask << x if x >= 0 else mask >> -x):
+            return False
+    return True
+
+
+def reachable_placements(rows, shape_id, rotation, x, y):
+    # 和玩家一样先原地旋转, 再左右平移; 返回 [(旋转次数, 列, 旋转状态)]
+    num_rotations = len(SHAPE_MASKS[shape_id])
+    placements = []
+    for turns in range(num_rotations):
+        r = (rotation + turns) % num_rotations
+        if not fits(rows, shape_id, r, x, y):
+            break
+        placements.append((turns, x, r))
+        for step in (-1, 1):
+            nx = x + step
+            while fits(rows, shape_id, r, nx, y):
+                placements.append((turns, nx, r))
+                nx += step
+    return placements
+
+
+def landing_y(rows, tops, shape_id, rotation, x, y):
+    # 方块整体在各列最高点之上时, 用列高直接算出落点, 否则逐行下落
+    distance = GRID_HEIGHT
+    for j, i in SHAPE_LOWEST[shape_id][rotation]:
+        gap = tops[x + j] - (y + i) - 1
+        if gap < 0:
+            break
+        distance = min(distance, gap)
+    else:
+        return y + distance
+    while fits(rows, shape_id, rotation, x, y + 1):
+        y += 1
+    return y
+
+
+def board_key(rows):
+    # 整个棋盘打包成一个整数(每行 GRID_WIDTH 位), 作为缓存键
+    key = 0
+    for row in rows:
+        key = (key << GRID_WIDTH) | row
+    return key
+
+
+def lock(rows, shape_id, rotation, x, y):
+    # 返回放置后(消行前)的棋盘元组
+    placed = list(rows)
+    for i, mask in SHAPE_MASKS[shape_id][rotation]:
+        if y + i >= 0:
+            placed[y + i] |= mask << x if x >= 0 else mask >> -x
+    return tuple(placed)
+
+
+def clear_full_rows(rows):
+    kept = [row for row in rows if row != FULL_ROW]
+    cleared = GRID_HEIGHT - len(kept)
+    return (0,) * cleared + tuple(kept), cleared
+
+
+def column_heights(rows):
+    return [GRID_HEIGHT - top for top in column_tops(rows)]
+
+
+def filled_cells(rows):
+    return sum(row.bit_count() for row in rows)
+
+
+class AutoPlayer:
+    def __init__(self, weights=DEFAULT_WEIGHTS, cache_size=1 << 10, beam=2, budget_ms=0.9):
+        self.weights = weights
+        self.cache_size = cache_size
+        self.beam = beam
+        self.budget = budget_ms / 1000  # 0: 不限时
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.plan = []
+        self.plan_piece = None
+
+    def evaluate(self, placed, heights, filled, shape_id, rotation, x, y):
+        # placed 是放置后消行前的棋盘元组, heights/filled 是放置前的列高和格子数
+        # 返回 (分数, 消行后的棋盘, 列高, 格子数, 消除行数)
+        key = board_key(placed)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return cached
+        self.misses += 1
+
+        cleared = sum(1 for i, _ in SHAPE_MASKS[shape_id][rotation]
+                      if y + i >= 0 and placed[y + i] == FULL_ROW)
+        if cleared:
+            rows, cleared = clear_full_rows(placed)
+            heights = tuple(column_heights(rows))
+            filled = filled_cells(rows)
+        else:
+            # 没有消行时只有方块所在的列会变高, 增量更新即可
+            rows = placed
+            heights = list(heights)
+            for j, i in SHAPE_HIGHEST[shape_id][rotation]:
+                heights[x + j] = max(heights[x + j], GRID_HEIGHT - y - i)
+            heights = tuple(heights)
+            filled += len(SHAPE_CELLS[shape_id][rotation])
+
+        # 每列高度以下的空格都是空洞
+        height = sum(heights)
+        holes = height - filled
+        bumpiness = sum(abs(a - b) for a, b in zip(heights, heights[1:]))
+        w_height, w_lines, w_holes, w_bumpiness = self.weights
+        value = (w_height * height + w_lines * cleared +
+                 w_holes * holes + w_bumpiness * bumpiness)
+        result = (value, rows, heights, filled, cleared)
+        self.cache[key] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return result
+
+    def expand(self, rows, heights, filled, shape_id, rotation, x, y):
+        # 枚举一个方块的所有落点: [(分数, 消行后的棋盘, 列高, 格子数, 消除行数, 旋转次数, 列)]
+        tops = [GRID_HEIGHT - h for h in heights]
+        results = []
+        for turns, px, r in reachable_placements(rows, shape_id, rotation, x, y):
+            py = landing_y(rows, tops, shape_id, r, px, y)
+            placed = lock(rows, shape_id, r, px, py)
+            results.append(self.evaluate(placed, heights, filled, shape_id, r, px, py) +
+                           (turns, px))
+        return results
+
+    def choose(self, tetris):
+        # 返回 (旋转次数, 目标列), 没有可放置的位置时返回 None
+        start = time.perf_counter()
+        piece = tetris.current_piece
+        following = tetris.next_piece
+        rows = board_rows(tetris)
+        first = self.expand(rows, column_heights(rows), filled_cells(rows), piece.shape_id,
+                            piece.rotation % len(piece.shape), piece.x, piece.y)
+        if not first:
+            return None
+
+        # 第一层只保留最好的几个落点, 再用下一个方块展开第二层
+        first.sort(key=lambda result: result[0], reverse=True)
+        best_value = None
+        best = None
+        w_lines = self.weights[1]
+        for value, after, heights, filled, cleared, turns, px in first[:self.beam]:
+            expand_start = time.perf_counter()
+            second = self.expand(after, heights, filled, following.shape_id, 0,
+                                 following.x, following.y)
+            total = max(result[0] for result in second) if second else value - 1000
+            total += w_lines * cleared
+            if best_value is None or total > best_value:
+                best_value = total
+                best = (turns, px)
+            now = time.perf_counter()
+            if self.budget and now - start + (now - expand_start) > self.budget:
+                break  # 下一个候选预计会超时, 不再展开
+        return best
+
+    def actions_for(self, tetris, placement):
+        turns, x = placement
+        dx = x - tetris.current_piece.x
+        return [ROTATE] * turns + [RIGHT if dx > 0 else LEFT] * abs(dx) + [HARD_DROP]
+
+    def next_action(self, tetris):
+        # 每帧给游戏循环一个动作; 新方块出现时重新规划
+        if tetris.current_piece is not self.plan_piece:
+            self.plan_piece = tetris.current_piece
+            placement = self.choose(tetris)
+            self.plan = self.actions_for(tetris, placement) if placement else []
+        return self.plan.pop(0) if self.plan else None
+
+    def play_piece(self, tetris):
+        # 无界面时直接执行整套动作并锁定方块
+        placement = self.choose(tetris)
+        if placement is None:
+            return False
+        for action in self.actions_for(tetris, placement):
+            tetris.apply_action(action)
+        tetris.fall_time = tetris.fall_speed
+        tetris.update(0)
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="俄罗斯方块自动玩家基准测试")
+    parser.add_argument("--games", type=int, default=5)
+    parser.add_argument("--max-pieces", type=int, default=2000)
+    parser.add_argument("--beam", type=int, default=2, help="第一层展开第二层的落点数")
+    parser.add_argument("--budget", type=float, default=0.9,
+                        help="每步搜索的软时间目标(毫秒): 预计超时就不再展开其余落点, "
+                             "但第一层总会算完, 实际最坏值见 max_ms_per_move; 0 不限时(可重复)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    player = AutoPlayer(beam=args.beam, budget_ms=args.budget)
+    move_ms = []
+    scores = []
+    for game in range(args.games):
+        tetris = BitboardTetris(args.seed + game)
+        for _ in range(args.max_pieces):
+            if tetris.game_over():
+                break
+            start = time.perf_counter()
+            placed = player.play_piece(tetris)
+            if not placed:
+                break
+            move_ms.append((time.perf_counter() - start) * 1000)
+        scores.append({'score': tetris.score, 'lines': tetris.lines_cleared})
+
+    print(json.dumps({
+        'games': scores,
+        'pieces': len(move_ms),
+        'ms_per_move': statistics.fmean(move_ms) if move_ms else 0.0,
+        'p95_ms_per_move': statistics.quantiles(move_ms, n=20)[-1] if len(move_ms) > 1 else 0.0,
+        'max_ms_per_move': max(move_ms, default=0.0),
+        'over_budget_moves': sum(ms > args.budget for ms in move_ms) if args.budget else 0,
+        'cache_hit_rate': player.hits / max(player.hits + player.misses, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import numpy as np
+
+from tetris_game import (
+    GRID_WIDTH, GRID_HEIGHT, BLACK, SHAPES, SHAPE_COLORS, SHAPE_CELLS,
+    LEFT, RIGHT, ROTATE, SOFT_DROP, HARD_DROP
+)
+
+# 无界面的批量俄罗斯方块模拟器: N局游戏的棋盘保存为 (N, 20, 10) 的数组,
+# 每个操作对所有对局同时向量化执行, 不需要安装pygame。
+# 计分、升级和下落速度规则与 tetris_game.Tetris.score_lines 完全一致。
+
+# 每个形状的旋转数, 以及补齐到4个旋转的格子表 CELL_TABLE[形状, 旋转] -> (4, 2) 的 (行, 列)
+NUM_ROTATIONS = np.array([len(shape) for shape in SHAPE_CELLS])
+CELL_TABLE = np.array([[shape[r % len(shape)] for r in range(4)] for shape in SHAPE_CELLS])
+
+# 棋盘中 0 表示空格, k 表示颜色 SHAPE_COLORS[k - 1]
+COLOR_TABLE = [BLACK] + SHAPE_COLORS
+
+SPAWN_X = GRID_WIDTH // 2 - 2
+
+
+class BatchTetris:
+    def __init__(self, n, seed=None):
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+        self.boards = np.zeros((n, GRID_HEIGHT, GRID_WIDTH), dtype=np.uint8)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.level = np.ones(n, dtype=np.int64)
+        self.lines_cleared = np.zeros(n, dtype=np.int64)
+        self.fall_time = np.zeros(n, dtype=np.float64)
+        self.fall_speed = np.full(n, 500, dtype=np.int64)
+        self.over = np.zeros(n, dtype=bool)
+
+        self.shape = self._random_shapes(n)
+        self.color = self._random_colors(n)
+        self.next_shape = self._random_shapes(n)
+        self.next_color = self._random_colors(n)
+        self.rotation = np.zeros(n, dtype=np.int64)
+        self.x = np.full(n, SPAWN_X, dtype=np.int64)
+        self.y = np.zeros(n, dtype=np.int64)
+
+        self._index = np.arange(n)
+
+    def _random_shapes(self, count):
+        return self.rng.integers(len(SHAPES), size=count)
+
+    def _random_colors(self, count):
+        return self.rng.integers(1, len(SHAPE_COLORS) + 1, size=count).astype(np.uint8)
+
+    def _cells(self, shape, rotation, x, y):
+        cells = CELL_TABLE[shape, rotation % NUM_ROTATIONS[shape]]
+        return y[:, None] + cells[..., 0], x[:, None] + cells[..., 1]
+
+    def fits(self, dx=0, dy=0, rotation=None):
+        # 对应 Tetris.valid_move, 返回每局是否可以移动
+        if rotation is None:
+            rotation = self.rotation
+        ys, xs = self._cells(self.shape, rotation, self.x + dx, self.y + dy)
+        inside = (xs >= 0) & (xs < GRID_WIDTH) & (ys < GRID_HEIGHT)
+        occupied = self.boards[self._index[:, None],
+                               np.clip(ys, 0, GRID_HEIGHT - 1),
+                               np.clip(xs, 0, GRID_WIDTH - 1)] != 0
+        return np.all(inside & ~(occupied & (ys >= 0)), axis=1)
+
+    def _active(self, mask):
+        active = ~self.over
+        if mask is not None:
+            active &= mask
+        return active
+
+    def move(self, dx, mask=None):
+        # dx 可以是标量或每局一个值的数组
+        ok = self._active(mask) & self.fits(dx=dx)
+        self.x += np.where(ok, dx, 0)
+        return ok
+
+    def rotate(self, mask=None):
+        new_rotation = (self.rotation + 1) % NUM_ROTATIONS[self.shape]
+        ok = self._active(mask) & self.fits(rotation=new_rotation)
+        self.rotation = np.where(ok, new_rotation, self.rotation)
+        return ok
+
+    def soft_drop(self, mask=None):
+        # 对应 ↓ 键: 下移一格并加1分
+        ok = self._active(mask) & self.fits(dy=1)
+        self.y += ok
+        self.score += ok
+        return ok
+
+    def drop(self, mask=None):
+        # 对应 Tetris.drop_piece: 落到底, 每行加2分, 但不锁定
+        moving = self._active(mask)
+        distance = np.zeros(self.n, dtype=np.int64)
+        while True:
+            moving &= self.fits(dy=1)
+            if not moving.any():
+                break
+            self.y += moving
+            distance += moving
+        self.score += distance * 2
+        return distance
+
+    def lock(self, mask=None):
+        # 对应 Tetris.update 中的落地分支: 放置、消行、生成下一个方块
+        active = self._active(mask)
+        games = np.flatnonzero(active)
+        if games.size == 0:
+            return np.zeros(self.n, dtype=np.int64)
+
+        ys, xs = self._cells(self.shape[games], self.rotation[games],
+                            self.x[games], self.y[games])
+        visible = ys >= 0
+        rows = np.broadcast_to(games[:, None], ys.shape)
+        colors = np.broadcast_to(self.color[games][:, None], ys.shape)
+        self.boards[rows[visible], ys[visible], xs[visible]] = colors[visible]
+
+        cleared = self.clear_lines(active)
+        self._spawn(games)
+        return cleared
+
+    def clear_lines(self, mask=None):
+        active = self._active(mask)
+        full = np.all(self.boards != 0, axis=2) & active[:, None]
+        cleared = full.sum(axis=1)
+        games = np.flatnonzero(cleared)
+        if games.size:
+            # 保留的行按原顺序压到底部, 上方补空行
+            keep = ~full[games]
+            kept_below = np.cumsum(keep[:, ::-1], axis=1)[:, ::-1]
+            target = GRID_HEIGHT - kept_below
+            compacted = np.zeros((games.size, GRID_HEIGHT, GRID_WIDTH), dtype=np.uint8)
+            local = np.broadcast_to(np.arange(games.size)[:, None], keep.shape)
+            compacted[local[keep], target[keep]] = self.boards[games][keep]
+            self.boards[games] = compacted
+
+        self.lines_cleared += cleared
+        self.score += cleared * 100 * self.level
+        self.level = self.lines_cleared // 10 + 1
+        self.fall_speed = np.maximum(50, 500 - (self.level - 1) * 50)
+        return cleared
+
+    def _spawn(self, games):
+        self.shape[games] = self.next_shape[games]
+        self.color[games] = self.next_color[games]
+        self.next_shape[games] = self._random_shapes(games.size)
+        self.next_color[games] = self._random_colors(games.size)
+        self.rotation[games] = 0
+        self.x[games] = SPAWN_X
+        self.y[games] = 0
+        self.over[games] |= ~self.fits()[games]
+
+    def tick(self, mask=None):
+        # 重力下落一格, 不能下落时锁定
+        active = self._active(mask)
+        falling = active & self.fits(dy=1)
+        self.y += falling
+        return self.lock(active & ~falling)
+
+    def update(self, dt):
+        # 对应 Tetris.update, 每局按自己的下落速度计时
+        self.fall_time += dt
+        due = ~self.over & (self.fall_time >= self.fall_speed)
+        self.fall_time[due] = 0
+        return self.tick(due)
+
+    def place(self, rotation, x, mask=None):
+        # 直接把方块转到指定旋转和列并硬降锁定, 用于评估摆放策略
+        # 目标位置放不下的对局保持原位直接下落, 返回值标记哪些对局摆放成功
+        active = self._active(mask)
+        rotation = np.broadcast_to(rotation, (self.n,)) % NUM_ROTATIONS[self.shape]
+        dx = np.broadcast_to(x, (self.n,)) - self.x
+        ok = active & self.fits(dx=dx, rotation=rotation)
+        self.rotation = np.where(ok, rotation, self.rotation)
+        self.x = np.where(ok, self.x + dx, self.x)
+        self.drop(active)
+        self.lock(active)
+        return ok
+
+    def step(self, actions):
+        # 每局执行一个动作(编号见 tetris_game.LEFT 等); HARD_DROP 会立即锁定, 其余动作之后不自动下落
+        actions = np.asarray(actions)
+        self.move(-1, actions == LEFT)
+        self.move(1, actions == RIGHT)
+        self.rotate(actions == ROTATE)
+        self.soft_drop(actions == SOFT_DROP)
+        hard = actions == HARD_DROP
+        self.drop(hard)
+        return self.lock(hard)
+
+    def grid(self, game):
+        # 转成与 Tetris.grid 相同的颜色网格, 便于对照和绘制
+        return [[COLOR_TABLE[cell] for cell in row] for row in self.boards[game].tolist()]
@@ -0,0 +1,186 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+# 渲染测试不打开窗口
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from tetris_game import (
+    GRID_WIDTH, GRID_HEIGHT, BLACK, SHAPE_COLORS, WINDOW_WIDTH, WINDOW_HEIGHT,
+    NOOP, LEFT, RIGHT, ROTATE, SOFT_DROP, HARD_DROP,
+    Tetris, BitboardTetris, pygame, draw_grid, draw_piece
+)
+
+# 俄罗斯方块引擎微基准: 每项输出每次操作的纳秒数(多轮取中位数), 结果为JSON,
+# 便于把不同版本的结果保存下来逐项对比。
+
+ENGINES = {'grid': Tetris, 'bitboard': BitboardTetris}
+ACTIONS = [NOOP, LEFT, RIGHT, ROTATE, SOFT_DROP, HARD_DROP]
+
+
+def random_board(rng, height, full_rows=0):
+    # 底部 height 行随机填充(每行至少留一个空格), 其中最下面 full_rows 行填满
+    grid = [[BLACK] * GRID_WIDTH for _ in range(GRID_HEIGHT)]
+    for y in range(GRID_HEIGHT - height, GRID_HEIGHT):
+        hole = rng.randrange(GRID_WIDTH)
+        for x in range(GRID_WIDTH):
+            if y >= GRID_HEIGHT - full_rows or (x != hole and rng.random() < 0.7):
+                grid[y][x] = rng.choice(SHAPE_COLORS)
+    return grid
+
+
+def load_board(tetris, grid):
+    # 摆好棋盘, 同时更新引擎用来找满行的行计数或行掩码
+    for row, source in zip(tetris.grid, grid):
+        row[:] = source
+    masks = [sum(1 << x for x, cell in enumerate(row) if cell != BLACK) for row in grid]
+    if isinstance(tetris, BitboardTetris):
+        tetris.rows[:] = masks
+    else:
+        tetris.row_fill[:] = [mask.bit_count() for mask in masks]
+    tetris.full_rows[:] = [y for y, mask in enumerate(masks) if mask.bit_count() == GRID_WIDTH]
+    tetris.board_version += 1
+
+
+def time_op(op, setup=None, number=2000, repeat=5):
+    # 只计 op 的时间; setup 在每次调用前执行且不计时。返回每次操作纳秒数的中位数
+    results = []
+    for _ in range(repeat):
+        total = 0
+        for _ in range(number):
+            if setup:
+                setup()
+            start = time.perf_counter_ns()
+            op()
+            total += time.perf_counter_ns() - start
+        results.append(total / number)
+    return statistics.median(results)
+
+
+def time_loop(op, number=20000, repeat=5):
+    # 无需每次重置状态的操作, 整体计时以减少计时器本身的开销
+    results = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            op()
+        results.append((time.perf_counter_ns() - start) / number)
+    return statistics.median(results)
+
+
+def bench_engine(engine, seed):
+    rng = random.Random(seed)
+    results = {}
+
+    tetris = engine(seed)
+    load_board(tetris, random_board(rng, 8))
+    piece = tetris.current_piece
+    moves = [(dx, dy) for dx in (-1, 0, 1) for dy in (0, 1)]
+
+    def probe():
+        valid_move = tetris.valid_move
+        for dx, dy in moves:
+            valid_move(piece, dx, dy)
+
+    results['valid_move_ns'] = time_loop(probe) / len(moves)
+
+    board = random_board(rng, 8)
+    results['place_piece_ns'] = time_op(
+        lambda: tetris.place_piece(piece), lambda: load_board(tetris, board))
+
+    for lines in range(5):
+        board = random_board(rng, 10, full_rows=lines)
+        results[f'clear_lines_{lines}_ns'] = time_op(
+            tetris.clear_lines, lambda: load_board(tetris, board))
+
+    board = random_board(rng, 8)
+    load_board(tetris, board)
+
+    def reset_piece():
+        piece.y = 0
+
+    results['drop_piece_ns'] = time_op(tetris.drop_piece, reset_piece)
+    return results
+
+
+def bench_games(engine, seed, games):
+    # 随机输入的完整对局, 每个模拟帧一个随机动作
+    rng = random.Random(seed)
+    ticks = 0
+    start = time.perf_counter()
+    for game in range(games):
+        tetris = engine(seed + game)
+        while not tetris.game_over():
+            tetris.step((rng.choice(ACTIONS),))
+        ticks += tetris.frame
+    elapsed = time.perf_counter() - start
+    return {'games_per_sec': games / elapsed, 'ticks_per_sec': ticks / elapsed}
+
+
+def bench_render(seed):
+    if pygame is None:
+        return {'skipped': 'pygame is not installed'}
+    pygame.display.init()
+    pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+    tetris = Tetris(seed)
+    load_board(tetris, random_board(random.Random(seed), 10))
+    results = {
+        'draw_grid_ns': time_loop(lambda: draw_grid(surface, tetris), number=500),
+        'draw_piece_ns': time_loop(lambda: draw_piece(surface, tetris.current_piece),
+                                   number=5000),
+    }
+    pygame.display.quit()
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="俄罗斯方块引擎微基准")
+    parser.add_argument("--engine", choices=sorted(ENGINES), action='append',
+                        help="要测试的引擎, 可重复; 默认全部")
+    parser.add_argument("--games", type=int, default=50, help="随机完整对局数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-render", action="store_true", help="跳过渲染测试")
+    parser.add_argument("--output", help="写入JSON文件, 默认输出到标准输出")
+    args = parser.parse_args()
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'commit': git_commit(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'engines': {},
+    }
+    for name in args.engine or sorted(ENGINES):
+        engine = ENGINES[name]
+        report['engines'][name] = bench_engine(engine, args.seed)
+        report['engines'][name].update(bench_games(engine, args.seed, args.games))
+    if not args.no_render:
+        report['render'] = bench_render(args.seed)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
-import pygame
+import argparse
+import json
 import random
 import sys
+import time
 
-# 初始化Pygame
-pygame.init()
+try:
+    import pygame
+except ImportError:  # 无界面模式(批量模拟、AI训练)不需要pygame
+    pygame = None
 
 # 游戏常量
 GRID_WIDTH = 10
@@ -16,6 +20,26 @@ GRID_Y_OFFSET = 50
 WINDOW_WIDTH = GRID_WIDTH * BLOCK_SIZE + GRID_X_OFFSET * 2 + 200  # 额外空间显示信息
 WINDOW_HEIGHT = GRID_HEIGHT * BLOCK_SIZE + GRID_Y_OFFSET * 2
 
+# 模拟帧率: 每帧固定推进 1000 / SIM_TICK_RATE 毫秒, 保证录像可以逐帧复现
+SIM_TICK_RATE = 60
+# 一个渲染帧最多补算的时间, 防止卡顿后模拟追赶不上(螺旋死亡)
+MAX_FRAME_MS = 250
+
+# 玩家动作编号, 用于录像回放和批量模拟
+NOOP, LEFT, RIGHT, ROTATE, SOFT_DROP, HARD_DROP = range(6)
+
+# 信息面板的位置
+PANEL_X = GRID_X_OFFSET + GRID_WIDTH * BLOCK_SIZE + 20
+CONTROLS = [
+    "控制说明:",
+    "←→ 移动",
+    "↑ 旋转", 
+    "↓ 软降",
+    "空格 硬降",
+    "R 重新开始",
+    "ESC 退出"
+]
+
 # 颜色定义
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -151,21 +175,61 @@ SHAPES = [
 
 # 形状颜色
 SHAPE_COLORS = [CYAN, YELLOW, PURPLE, GREEN, RED, BLUE, ORANGE]
+EMPTY_ROW = (BLACK,) * GRID_WIDTH
+
+def compile_shape(shape):
+    # 把一个5x5字符串形状解析成占用格偏移、包围盒和每列最低格
+    cells = tuple((i, j) for i, row in enumerate(shape)
+                  for j, cell in enumerate(row) if cell == '#')
+    rows = [i for i, _ in cells]
+    cols = [j for _, j in cells]
+    bounds = (min(rows), min(cols), max(rows), max(cols))
+    lowest = {}
+    for i, j in cells:
+        lowest[j] = max(lowest.get(j, i), i)
+    return cells, bounds, tuple(sorted(lowest.items()))
+
+# 预编译形状表, 导入时只解析一次, 热路径不再逐字符比较'#'
+# SHAPE_CELLS[形状序号][旋转]  -> ((行, 列), ...) 占用格偏移
+# SHAPE_BOUNDS[形状序号][旋转] -> (最小行, 最小列, 最大行, 最大列)
+# SHAPE_LOWEST[形状序号][旋转] -> ((列, 该列最低行), ...) 下落时只有这些格会碰撞
+_COMPILED_SHAPES = [[compile_shape(rotation) for rotation in shape] for shape in SHAPES]
+SHAPE_CELLS = [[c[0] for c in shape] for shape in _COMPILED_SHAPES]
+SHAPE_BOUNDS = [[c[1] for c in shape] for shape in _COMPILED_SHAPES]
+SHAPE_LOWEST = [[c[2] for c in shape] for shape in _COMPILED_SHAPES]
 
 class Piece:
-    def __init__(self, x, y):
+    def __init__(self, x, y, rng=random):
         self.x = x
         self.y = y
-        self.shape = random.choice(SHAPES)
-        self.color = random.choice(SHAPE_COLORS)
+        self.shape_id = rng.randrange(len(SHAPES))
+        self.shape = SHAPES[self.shape_id]
+        self.color = rng.choice(SHAPE_COLORS)
         self.rotation = 0
         
     def get_rotated_shape(self):
         return self.shape[self.rotation % len(self.shape)]
+    
+    def get_cells(self, rotation=None):
+        if rotation is None:
+            rotation = self.rotation
+        cells = SHAPE_CELLS[self.shape_id]
+        return cells[rotation % len(cells)]
 
 class Tetris:
-    def __init__(self):
+    def __init__(self, seed=None):
+        # 每局游戏有自己的随机数生成器, 相同的种子产生相同的方块序列
+        self.seed = random.getrandbits(63) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.frame = 0
         self.grid = [[BLACK for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
+        # 每行已占用的格子数, 以及放置方块后变满的行, 消行时不用扫描整个棋盘
+        self.row_fill = [0] * GRID_HEIGHT
+        self.full_rows = []
+        # 棋盘每次放置方块后加一, 用来判断缓存的影子位置是否失效
+        self.board_version = 0
+        self._ghost_key = None
+        self._ghost_y = 0
         self.current_piece = self.get_new_piece()
         self.next_piece = self.get_new_piece()
         self.score = 0
@@ -175,47 +239,68 @@ class Tetris:
         self.fall_speed = 500  # 毫秒
         
     def get_new_piece(self):
-        return Piece(GRID_WIDTH // 2 - 2, 0)
+        return Piece(GRID_WIDTH // 2 - 2, 0, self.rng)
     
     def valid_move(self, piece, dx, dy, rotation=None):
         if rotation is None:
             rotation = piece.rotation
             
-        shape = piece.shape[rotation % len(piece.shape)]
+        rotation %= len(piece.shape)
+        x0 = piece.x + dx
+        y0 = piece.y + dy
+        
+        # 先用包围盒排除越界, 再只检查真正占用的格子
+        _, min_col, max_row, max_col = SHAPE_BOUNDS[piece.shape_id][rotation]
+        if x0 + min_col < 0 or x0 + max_col >= GRID_WIDTH or y0 + max_row >= GRID_HEIGHT:
+            return False
         
-        for i, row in enumerate(shape):
-            for j, cell in enumerate(row):
-                if cell == '#':
-                    x = piece.x + j + dx
-                    y = piece.y + i + dy
-                    
-                    if (x < 0 or x >= GRID_WIDTH or 
-                        y >= GRID_HEIGHT or 
-                        (y >= 0 and self.grid[y][x] != BLACK)):
-                        return False
+        grid = self.grid
+        for i, j in SHAPE_CELLS[piece.shape_id][rotation]:
+            y = y0 + i
+            if y >= 0 and grid[y][x0 + j] != BLACK:
+                return False
         return True
     
     def place_piece(self, piece):
-        shape = piece.get_rotated_shape()
-        for i, row in enumerate(shape):
-            for j, cell in enumerate(row):
-                if cell == '#':
-                    x = piece.x + j
-                    y = piece.y + i
-                    if y >= 0:
-                        self.grid[y][x] = piece.color
+        self.board_version += 1
+        for i, j in piece.get_cells():
+            y = piece.y + i
+            if y >= 0:
+                self.grid[y][piece.x + j] = piece.color
+                self.row_fill[y] += 1
+                if self.row_fill[y] == GRID_WIDTH:
+                    self.full_rows.append(y)
     
     def clear_lines(self):
-        lines_to_clear = []
-        for y in range(GRID_HEIGHT):
-            if all(cell != BLACK for cell in self.grid[y]):
-                lines_to_clear.append(y)
-        
-        for y in lines_to_clear:
-            del self.grid[y]
-            self.grid.insert(0, [BLACK for _ in range(GRID_WIDTH)])
-        
-        lines_cleared = len(lines_to_clear)
+        lines_cleared = len(self.full_rows)
+        if lines_cleared:
+            self.full_rows.sort()
+            self.compact_rows(self.full_rows)
+            self.full_rows.clear()
+        return self.score_lines(lines_cleared)
+    
+    def compact_rows(self, full_rows):
+        # 从最低的满行往上, 把未满的行下移(只移动行的引用, 不分配新列表),
+        # 遇到空行就停止: 空行之上一定都是空的。被消除的行清空后放到顶部复用。
+        grid = self.grid
+        fill = self.row_fill
+        recycled = [grid[y] for y in full_rows]
+        write = full_rows[-1]
+        read = write - 1
+        while read >= 0 and fill[read]:
+            if fill[read] != GRID_WIDTH:
+                grid[write] = grid[read]
+                fill[write] = fill[read]
+                write -= 1
+            read -= 1
+        for row in recycled:
+            row[:] = EMPTY_ROW
+            grid[write] = row
+            fill[write] = 0
+            write -= 1
+
+    def score_lines(self, lines_cleared):
+        # 计分和升级规则, 所有引擎共用
         self.lines_cleared += lines_cleared
         self.score += lines_cleared * 100 * self.level
         self.level = self.lines_cleared // 10 + 1
@@ -247,58 +332,204 @@ class Tetris:
         if self.valid_move(self.current_piece, 0, 0, new_rotation):
             self.current_piece.rotation = new_rotation
     
-    def drop_piece(self):
-        while self.valid_move(self.current_piece, 0, 1):
+    def soft_drop(self):
+        if self.valid_move(self.current_piece, 0, 1):
             self.current_piece.y += 1
-            self.score += 2
+            self.score += 1
+    
+    def apply_action(self, action):
+        if action == LEFT:
+            self.move_piece(-1)
+        elif action == RIGHT:
+            self.move_piece(1)
+        elif action == ROTATE:
+            self.rotate_piece()
+        elif action == SOFT_DROP:
+            self.soft_drop()
+        elif action == HARD_DROP:
+            self.drop_piece()
+    
+    def step(self, actions, dt=1000 / SIM_TICK_RATE):
+        # 推进一个模拟帧: 先执行本帧的输入, 再计算重力下落
+        for action in actions:
+            self.apply_action(action)
+        self.update(dt)
+        self.frame += 1
+    
+    def drop_distance(self, piece):
+        # 硬降能下落的行数: 竖直下落时只有每列最低的格子可能碰撞
+        lowest = SHAPE_LOWEST[piece.shape_id]
+        distance = GRID_HEIGHT
+        for j, i in lowest[piece.rotation % len(lowest)]:
+            x = piece.x + j
+            y = piece.y + i + 1
+            while y < GRID_HEIGHT and (y < 0 or self.grid[y][x] == BLACK):
+                y += 1
+            distance = min(distance, y - piece.y - i - 1)
+        return distance
+    
+    def ghost_y(self):
+        # 影子方块(硬降落点)所在的行, 只在方块平移、旋转或棋盘变化后重新计算;
+        # 重力和软降只让方块沿同一列下落, 落点不变
+        piece = self.current_piece
+        key = (piece, piece.x, piece.rotation, self.board_version)
+        if key != self._ghost_key:
+            self._ghost_key = key
+            self._ghost_y = piece.y + self.drop_distance(piece)
+        return self._ghost_y
+    
+    def drop_piece(self):
+        distance = self.drop_distance(self.current_piece)
+        self.current_piece.y += distance
+        self.score += distance * 2
+
+# 位棋盘: 每一行是一个整数, 第x位为1表示该格已被占用
+FULL_ROW = (1 << GRID_WIDTH) - 1
+
+def build_row_masks(cells):
+    # 把占用格偏移预编译成 ((行偏移, 行掩码), ...)
+    masks = {}
+    for i, j in cells:
+        masks[i] = masks.get(i, 0) | (1 << j)
+    return tuple(sorted(masks.items()))
+
+# SHAPE_MASKS[形状序号][旋转] -> 行掩码元组
+SHAPE_MASKS = [[build_row_masks(cells) for cells in shape] for shape in SHAPE_CELLS]
+
+# 位棋盘引擎: 碰撞检测只需几次按位与运算, 适合无界面的大量AI训练对局
+# self.rows 是引擎的权威状态; self.grid 仍然同步保存颜色, 供绘制函数使用
+class BitboardTetris(Tetris):
+    def __init__(self, seed=None):
+        self.rows = [0] * GRID_HEIGHT
+        super().__init__(seed)
+        # 行是否满、是否为空直接由行掩码判断, 不需要计数
+        self.row_fill = None
+
+    def valid_move(self, piece, dx, dy, rotation=None):
+        if rotation is None:
+            rotation = piece.rotation
+
+        rotation %= len(piece.shape)
+        x = piece.x + dx
+        y = piece.y + dy
+        _, min_col, max_row, max_col = SHAPE_BOUNDS[piece.shape_id][rotation]
+        if x + min_col < 0 or x + max_col >= GRID_WIDTH or y + max_row >= GRID_HEIGHT:
+            return False
+
+        rows = self.rows
+        for i, mask in SHAPE_MASKS[piece.shape_id][rotation]:
+            row_y = y + i
+            if row_y >= 0 and rows[row_y] & (mask << x if x >= 0 else mask >> -x):
+                return False
+        return True
+
+    def place_piece(self, piece):
+        self.board_version += 1
+        masks = SHAPE_MASKS[piece.shape_id]
+        x = piece.x
+        for i, mask in masks[piece.rotation % len(masks)]:
+            y = piece.y + i
+            if y < 0:
+                continue
+            placed = mask << x if x >= 0 else mask >> -x
+            self.rows[y] |= placed
+            if self.rows[y] == FULL_ROW:
+                self.full_rows.append(y)
+            grid_row = self.grid[y]
+            while placed:
+                low = placed & -placed
+                grid_row[low.bit_length() - 1] = piece.color
+                placed ^= low
+
+    def compact_rows(self, full_rows):
+        grid = self.grid
+        rows = self.rows
+        recycled = [grid[y] for y in full_rows]
+        write = full_rows[-1]
+        read = write - 1
+        while read >= 0 and rows[read]:
+            if rows[read] != FULL_ROW:
+                grid[write] = grid[read]
+                rows[write] = rows[read]
+                write -= 1
+            read -= 1
+        for row in recycled:
+            row[:] = EMPTY_ROW
+            grid[write] = row
+            rows[write] = 0
+            write -= 1
+
+# 预渲染的方块贴图, 按尺寸缓存: {尺寸: ({颜色: 方块}, {颜色: 影子方块})}
+# 需要在 pygame.display.set_mode 之后第一次使用, 以便转换成屏幕的像素格式
+_block_sprites = {}
+
+def get_block_sprites(size=BLOCK_SIZE):
+    if size not in _block_sprites:
+        blocks = {}
+        ghosts = {}
+        for color in [BLACK] + SHAPE_COLORS:
+            block = pygame.Surface((size, size)).convert()
+            block.fill(color)
+            pygame.draw.rect(block, WHITE, block.get_rect(), 1)
+            blocks[color] = block
+            
+            ghost = pygame.Surface((size, size)).convert()
+            ghost.fill(BLACK)
+            pygame.draw.rect(ghost, WHITE, ghost.get_rect(), 1)
+            pygame.draw.rect(ghost, color, ghost.get_rect().inflate(-6, -6), 2)
+            ghosts[color] = ghost
+        _block_sprites[size] = (blocks, ghosts)
+    return _block_sprites[size]
 
 def draw_grid(screen, tetris):
     # 绘制游戏网格背景
-    for y in range(GRID_HEIGHT):
-        for x in range(GRID_WIDTH):
-            rect = pygame.Rect(
-                GRID_X_OFFSET + x * BLOCK_SIZE,
-                GRID_Y_OFFSET + y * BLOCK_SIZE,
-                BLOCK_SIZE,
-                BLOCK_SIZE
-            )
-            pygame.draw.rect(screen, tetris.grid[y][x], rect)
-            pygame.draw.rect(screen, WHITE, rect, 1)
-
-def draw_piece(screen, piece):
-    shape = piece.get_rotated_shape()
-    for i, row in enumerate(shape):
-        for j, cell in enumerate(row):
-            if cell == '#':
-                x = piece.x + j
-                y = piece.y + i
-                if 0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT:
-                    rect = pygame.Rect(
-                        GRID_X_OFFSET + x * BLOCK_SIZE,
-                        GRID_Y_OFFSET + y * BLOCK_SIZE,
-                        BLOCK_SIZE,
-                        BLOCK_SIZE
-                    )
-                    pygame.draw.rect(screen, piece.color, rect)
-                    pygame.draw.rect(screen, WHITE, rect, 1)
+    blocks, _ = get_block_sprites()
+    screen.blits([(blocks[color], (GRID_X_OFFSET + x * BLOCK_SIZE, GRID_Y_OFFSET + y * BLOCK_SIZE))
+                  for y, row in enumerate(tetris.grid) for x, color in enumerate(row)],
+                 doreturn=False)
+
+def piece_blits(piece, sprite, y=None, offset_y=0):
+    # 方块在网格内的每个格子: [(贴图, 屏幕坐标)]
+    if y is None:
+        y = piece.y
+    blits = []
+    for i, j in piece.get_cells():
+        cx = piece.x + j
+        cy = y + i
+        if 0 <= cx < GRID_WIDTH and 0 <= cy < GRID_HEIGHT:
+            blits.append((sprite, (GRID_X_OFFSET + cx * BLOCK_SIZE,
+                                   GRID_Y_OFFSET + cy * BLOCK_SIZE + offset_y)))
+    return blits
+
+def draw_ghost(screen, tetris):
+    # 影子方块: 显示硬降后的落点
+    piece = tetris.current_piece
+    ghost_y = tetris.ghost_y()
+    if ghost_y != piece.y:
+        _, ghosts = get_block_sprites()
+        screen.blits(piece_blits(piece, ghosts[piece.color], ghost_y), doreturn=False)
+
+def fall_offset(tetris, alpha, tick_ms):
+    # 插值: 按重力计时把正在下落的方块画在当前行和下一行之间
+    # alpha 是累加器中还没模拟的时间占一个模拟帧的比例
+    if not tetris.valid_move(tetris.current_piece, 0, 1):
+        return 0
+    progress = (tetris.fall_time + alpha * tick_ms) / tetris.fall_speed
+    return int(min(progress, 1) * BLOCK_SIZE)
+
+def draw_piece(screen, piece, offset_y=0):
+    blocks, _ = get_block_sprites()
+    screen.blits(piece_blits(piece, blocks[piece.color], offset_y=offset_y), doreturn=False)
 
 def draw_next_piece(screen, piece, font):
     # 绘制下一个方块
     text = font.render("下一个:", True, WHITE)
     screen.blit(text, (GRID_X_OFFSET + GRID_WIDTH * BLOCK_SIZE + 20, 100))
     
-    shape = piece.get_rotated_shape()
-    for i, row in enumerate(shape):
-        for j, cell in enumerate(row):
-            if cell == '#':
-                rect = pygame.Rect(
-                    GRID_X_OFFSET + GRID_WIDTH * BLOCK_SIZE + 20 + j * 20,
-                    130 + i * 20,
-                    20,
-                    20
-                )
-                pygame.draw.rect(screen, piece.color, rect)
-                pygame.draw.rect(screen, WHITE, rect, 1)
+    blocks, _ = get_block_sprites(20)
+    sprite = blocks[piece.color]
+    for i, j in piece.get_cells():
+        screen.blit(sprite, (GRID_X_OFFSET + GRID_WIDTH * BLOCK_SIZE + 20 + j * 20, 130 + i * 20))
 
 def draw_info(screen, tetris, font):
     # 绘制游戏信息
@@ -311,34 +542,225 @@ def draw_info(screen, tetris, font):
     screen.blit(lines_text, (GRID_X_OFFSET + GRID_WIDTH * BLOCK_SIZE + 20, 80))
     
     # 控制说明
-    controls = [
-        "控制说明:",
-        "←→ 移动",
-        "↑ 旋转", 
-        "↓ 软降",
-        "空格 硬降",
-        "R 重新开始",
-        "ESC 退出"
-    ]
-    
-    for i, text in enumerate(controls):
+    for i, text in enumerate(CONTROLS):
         color = YELLOW if i == 0 else WHITE
         control_text = font.render(text, True, color)
         screen.blit(control_text, (GRID_X_OFFSET + GRID_WIDTH * BLOCK_SIZE + 20, 250 + i * 25))
 
+# 脏矩形渲染器: 已落地的方块缓存在一张背景Surface上, 只重绘变化的格子,
+# 文字标签只在数值变化时重新渲染, 最后用 pygame.display.update(脏矩形) 只提交变化的区域
+class DirtyRectRenderer:
+    def __init__(self, screen, font, big_font):
+        self.screen = screen
+        self.font = font
+        self.board = pygame.Surface((GRID_WIDTH * BLOCK_SIZE, GRID_HEIGHT * BLOCK_SIZE))
+        self.board_rect = self.board.get_rect(topleft=(GRID_X_OFFSET, GRID_Y_OFFSET))
+        self.info_rect = pygame.Rect(PANEL_X, 20, WINDOW_WIDTH - PANEL_X, 80)
+        self.next_rect = pygame.Rect(PANEL_X, 130, 5 * 20, 5 * 20)
+        
+        # 静态文字只渲染一次
+        self.next_label = font.render("下一个:", True, WHITE)
+        self.control_labels = [font.render(text, True, YELLOW if i == 0 else WHITE)
+                               for i, text in enumerate(CONTROLS)]
+        self.game_over_text = big_font.render("游戏结束!", True, RED)
+        self.restart_text = font.render("按 R 重新开始", True, WHITE)
+        
+        self.tetris = None
+        self.game_over = False
+        self.cached_grid = None
+        self.piece_rects = []
+        self.next_key = None
+        self.info_values = None
+    
+    def cell_rect(self, x, y):
+        return pygame.Rect(GRID_X_OFFSET + x * BLOCK_SIZE, GRID_Y_OFFSET + y * BLOCK_SIZE,
+                           BLOCK_SIZE, BLOCK_SIZE)
+    
+    def draw_board_cell(self, x, y, color):
+        blocks, _ = get_block_sprites()
+        self.board.blit(blocks[color], (x * BLOCK_SIZE, y * BLOCK_SIZE))
+    
+    def redraw_all(self, tetris):
+        self.screen.fill(BLACK)
+        for y in range(GRID_HEIGHT):
+            for x in range(GRID_WIDTH):
+                self.draw_board_cell(x, y, tetris.grid[y][x])
+        self.cached_grid = [row[:] for row in tetris.grid]
+        self.screen.blit(self.board, self.board_rect)
+        self.screen.blit(self.next_label, (PANEL_X, 100))
+        for i, label in enumerate(self.control_labels):
+            self.screen.blit(label, (PANEL_X, 250 + i * 25))
+        self.piece_rects = []
+        self.next_key = None
+        self.info_values = None
+    
+    def update_board(self, tetris, dirty):
+        # 只有落地或消行时才会有格子变化, 逐行比较的代价远小于重画200个格子
+        for y, (row, cached) in enumerate(zip(tetris.grid, self.cached_grid)):
+            if row == cached:
+                continue
+            for x in range(GRID_WIDTH):
+                if row[x] != cached[x]:
+                    self.draw_board_cell(x, y, row[x])
+                    rect = self.cell_rect(x, y)
+                    self.screen.blit(self.board, rect, rect.move(-GRID_X_OFFSET, -GRID_Y_OFFSET))
+                    dirty.append(rect)
+            cached[:] = row
+    
+    def draw_piece(self, tetris, dirty, offset_y=0):
+        # 先用背景缓存擦掉上一帧的方块和影子, 再画当前的影子和方块
+        for rect in self.piece_rects:
+            self.screen.blit(self.board, rect, rect.move(-GRID_X_OFFSET, -GRID_Y_OFFSET))
+        dirty.extend(self.piece_rects)
+        
+        self.piece_rects = []
+        if tetris is None:
+            return
+        piece = tetris.current_piece
+        blocks, ghosts = get_block_sprites()
+        blits = piece_blits(piece, ghosts[piece.color], tetris.ghost_y())
+        blits += piece_blits(piece, blocks[piece.color], offset_y=offset_y)
+        self.piece_rects = self.screen.blits(blits)
+        dirty.extend(self.piece_rects)
+    
+    def draw_next_piece(self, piece, dirty):
+        key = (piece.shape_id, piece.rotation, piece.color)
+        if key == self.next_key:
+            return
+        self.next_key = key
+        self.screen.fill(BLACK, self.next_rect)
+        blocks, _ = get_block_sprites(20)
+        for i, j in piece.get_cells():
+            self.screen.blit(blocks[piece.color], (PANEL_X + j * 20, 130 + i * 20))
+        dirty.append(self.next_rect)
+    
+    def draw_info(self, tetris, dirty):
+        values = (tetris.score, tetris.level, tetris.lines_cleared)
+        if values == self.info_values:
+            return
+        self.info_values = values
+        self.screen.fill(BLACK, self.info_rect)
+        for i, text in enumerate((f"分数: {tetris.score}", f"等级: {tetris.level}",
+                                  f"行数: {tetris.lines_cleared}")):
+            self.screen.blit(self.font.render(text, True, WHITE), (PANEL_X, 20 + i * 30))
+        dirty.append(self.info_rect)
+    
+    def draw(self, tetris, game_over, offset_y=0):
+        full = tetris is not self.tetris or game_over != self.game_over
+        self.tetris = tetris
+        self.game_over = game_over
+        dirty = []
+        
+        if full:
+            self.redraw_all(tetris)
+        else:
+            self.update_board(tetris, dirty)
+        self.draw_piece(None if game_over else tetris, dirty, offset_y)
+        self.draw_next_piece(tetris.next_piece, dirty)
+        self.draw_info(tetris, dirty)
+        
+        if full:
+            if game_over:
+                self.screen.blit(self.game_over_text, self.game_over_text.get_rect(
+                    center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//2)))
+                self.screen.blit(self.restart_text, self.restart_text.get_rect(
+                    center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 + 50)))
+            pygame.display.flip()
+        elif dirty:
+            pygame.display.update(dirty)
+
 def main():
+    parser = argparse.ArgumentParser(description="俄罗斯方块")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="只重绘变化的区域, 适合低性能设备")
+    parser.add_argument("--record-dir",
+                        help="把每局的输入录像保存到这个目录, 可用 tetris_replay.py 回放")
+    parser.add_argument("--autoplay", action="store_true",
+                        help="由 tetris_ai.AutoPlayer 自动游戏, 用于演示和压力测试")
+    parser.add_argument("--tick-rate", type=int, default=SIM_TICK_RATE,
+                        help="每秒模拟帧数, 与渲染帧率无关")
+    parser.add_argument("--fps", type=int, default=60,
+                        help="渲染帧率上限, 0 表示不限制")
+    parser.add_argument("--interpolate", action="store_true",
+                        help="在两个模拟帧之间平滑绘制下落中的方块")
+    parser.add_argument("--benchmark", type=float, nargs='?', const=10.0, metavar="SECONDS",
+                        help="不限帧率自动游戏若干秒, 分别输出模拟和渲染的速度")
+    parser.add_argument("--profile", action="store_true",
+                        help="显示每帧耗时面板(等待/事件/模拟/渲染/flip), 退出时输出 p50/p95/p99")
+    parser.add_argument("--profile-trace", metavar="PATH",
+                        help="把每帧耗时保存为 CSV, 文件名以 .json 结尾时保存为 JSON")
+    args = parser.parse_args()
+    if args.benchmark:
+        args.fps = 0
+        args.autoplay = True
+    
+    if args.record_dir:
+        from tetris_replay import InputLog
+    autoplayer = None
+    if args.autoplay:
+        from tetris_ai import AutoPlayer
+        autoplayer = AutoPlayer()
+    
+    # 初始化Pygame
+    pygame.init()
     screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
     pygame.display.set_caption("俄罗斯方块")
     clock = pygame.time.Clock()
     font = pygame.font.Font(None, 24)
     big_font = pygame.font.Font(None, 48)
     
-    tetris = Tetris()
+    key_actions = {
+        pygame.K_LEFT: LEFT,
+        pygame.K_RIGHT: RIGHT,
+        pygame.K_DOWN: SOFT_DROP,
+        pygame.K_UP: ROTATE,
+        pygame.K_SPACE: HARD_DROP,
+    }
+    
+    def new_game():
+        tetris = Tetris()
+        log = InputLog(tetris.seed, args.tick_rate) if args.record_dir else None
+        return tetris, log
+    
+    def save_log():
+        if log is not None and tetris.frame > 0:
+            log.finish(tetris)
+            log.save(args.record_dir)
+    
+    tetris, log = new_game()
     running = True
     game_over = False
+    renderer = DirtyRectRenderer(screen, font, big_font) if args.dirty_rects else None
+    
+    # 逐帧计时(可选): 各阶段的耗时之和就是整帧时间, 面板画在信息栏底部
+    profiler = hud = None
+    if args.profile or args.profile_trace:
+        from frame_profiler import FrameProfiler, ProfilerHUD
+        profiler = FrameProfiler(fps=args.fps)
+        if args.profile:
+            hud = ProfilerHUD(profiler, font, position=(PANEL_X, WINDOW_HEIGHT - 150), width=200)
+    
+    # 固定步长循环: 渲染帧之间经过的真实时间放进累加器, 每满一个模拟帧就推进一次模拟
+    tick_ms = 1000 / args.tick_rate
+    accumulator = 0.0
+    actions = []
+    frames = 0
+    ticks = 0
+    sim_time = 0.0
+    render_time = 0.0
+    start = last_time = time.perf_counter()
     
     while running:
-        dt = clock.tick(60)
+        if profiler:
+            profiler.begin()
+        clock.tick(args.fps)
+        if profiler:
+            profiler.mark('wait')
+        now = time.perf_counter()
+        accumulator += min((now - last_time) * 1000, MAX_FRAME_MS)
+        last_time = now
+        if args.benchmark and now - start >= args.benchmark:
+            running = False
         
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -347,33 +769,66 @@ def main():
                 if event.key == pygame.K_ESCAPE:
                     running = False
                 elif event.key == pygame.K_r:
-                    tetris = Tetris()
+                    if not game_over:
+                        save_log()
+                    tetris, log = new_game()
                     game_over = False
-                elif not game_over:
-                    if event.key == pygame.K_LEFT:
-                        tetris.move_piece(-1)
-                    elif event.key == pygame.K_RIGHT:
-                        tetris.move_piece(1)
-                    elif event.key == pygame.K_DOWN:
-                        if tetris.valid_move(tetris.current_piece, 0, 1):
-                            tetris.current_piece.y += 1
-                            tetris.score += 1
-                    elif event.key == pygame.K_UP:
-                        tetris.rotate_piece()
-                    elif event.key == pygame.K_SPACE:
-                        tetris.drop_piece()
+                    actions = []
+                elif not game_over and event.key in key_actions:
+                    actions.append(key_actions[event.key])
+        if profiler:
+            profiler.mark('event')
         
-        if not game_over:
-            tetris.update(dt)
+        # 输入在下一个模拟帧生效; 这一帧没有模拟时留到下一帧
+        sim_start = time.perf_counter()
+        while accumulator >= tick_ms:
+            accumulator -= tick_ms
+            if game_over:
+                actions = []
+                continue
+            if autoplayer:
+                action = autoplayer.next_action(tetris)
+                if action is not None:
+                    actions.append(action)
+            if log is not None:
+                for action in actions:
+                    log.record(tetris.frame, action)
+            tetris.step(actions, tick_ms)
+            actions = []
+            ticks += 1
             if tetris.game_over():
                 game_over = True
+                save_log()
+                if args.benchmark:
+                    tetris, log = new_game()
+                    game_over = False
+        render_start = time.perf_counter()
+        sim_time += render_start - sim_start
+        if profiler:
+            profiler.mark('sim')
+        
+        offset_y = 0
+        if args.interpolate and not game_over:
+            offset_y = fall_offset(tetris, accumulator / tick_ms, tick_ms)
         
         # 绘制
+        frames += 1
+        if renderer:
+            renderer.draw(tetris, game_over, offset_y)
+            if hud:
+                pygame.display.update(hud.draw(screen))
+            render_time += time.perf_counter() - render_start
+            if profiler:
+                # 脏矩形模式在 renderer.draw 里提交画面, 都算作渲染
+                profiler.mark('render')
+            continue
+        
         screen.fill(BLACK)
         draw_grid(screen, tetris)
         
         if not game_over:
-            draw_piece(screen, tetris.current_piece)
+            draw_ghost(screen, tetris)
+            draw_piece(screen, tetris.current_piece, offset_y)
         
         draw_next_piece(screen, tetris.next_piece, font)
         draw_info(screen, tetris, font)
@@ -386,8 +841,33 @@ def main():
             screen.blit(game_over_text, text_rect)
             screen.blit(restart_text, restart_rect)
         
+        if hud:
+            hud.draw(screen)
+        if profiler:
+            profiler.mark('render')
         pygame.display.flip()
+        render_time += time.perf_counter() - render_start
+        if profiler:
+            profiler.mark('flip')
     
+    if not game_over:
+        save_log()
+    if profiler:
+        profiler.finish()
+        profiler.report()
+        if args.profile_trace:
+            profiler.save(args.profile_trace)
+    if args.benchmark:
+        elapsed = time.perf_counter() - start
+        print(json.dumps({
+            'seconds': elapsed,
+            'sim_ticks': ticks,
+            'sim_ticks_per_sec': ticks / elapsed,
+            'sim_capacity_ticks_per_sec': ticks / sim_time if sim_time else 0.0,
+            'render_frames': frames,
+            'render_fps': frames / elapsed,
+            'render_ms_per_frame': render_time * 1000 / max(frames, 1),
+        }, indent=2))
     pygame.quit()
     sys.exit()
 
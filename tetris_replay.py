@@ -0,0 +1,132 @@
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+
+from tetris_game import SIM_TICK_RATE, Tetris, BitboardTetris
+
+# 俄罗斯方块录像: 一局游戏由随机种子和 (帧号, 动作) 输入序列完全确定。
+# 文件格式(小端):
+#   文件头  magic 'TRPL', 版本, 模拟帧率, 种子
+#   记录    每条5字节: 帧号(uint32) + 动作(uint8)
+#   结束    帧号 = 总帧数, 动作 = END, 之后是最终分数和消除行数, 用于回归校验
+HEADER = struct.Struct('<4sBHQ')
+RECORD = struct.Struct('<IB')
+FOOTER = struct.Struct('<QI')
+MAGIC = b'TRPL'
+VERSION = 1
+END = 0xFF
+
+ENGINES = {'grid': Tetris, 'bitboard': BitboardTetris}
+
+
+class InputLog:
+    def __init__(self, seed, tick_rate=SIM_TICK_RATE):
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.records = bytearray()
+        self.frames = 0
+        self.score = None
+        self.lines_cleared = None
+
+    def record(self, frame, action):
+        self.records += RECORD.pack(frame, action)
+
+    def finish(self, tetris):
+        self.frames = tetris.frame
+        self.score = tetris.score
+        self.lines_cleared = tetris.lines_cleared
+
+    def events(self):
+        return RECORD.iter_unpack(self.records)
+
+    def to_bytes(self):
+        return (HEADER.pack(MAGIC, VERSION, self.tick_rate, self.seed) + self.records +
+                RECORD.pack(self.frames, END) + FOOTER.pack(self.score, self.lines_cleared))
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, tick_rate, seed = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("不是有效的俄罗斯方块录像文件")
+        log = cls(seed, tick_rate)
+        end = len(data) - FOOTER.size - RECORD.size
+        log.records = bytearray(data[HEADER.size:end])
+        log.frames, action = RECORD.unpack_from(data, end)
+        if action != END:
+            raise ValueError("录像文件不完整")
+        log.score, log.lines_cleared = FOOTER.unpack_from(data, end + RECORD.size)
+        return log
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"tetris_{self.seed}.trpl")
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+def replay(log, engine=Tetris):
+    # 无界面、不限速地重新模拟一局, 返回结束时的游戏状态
+    tetris = engine(log.seed)
+    dt = 1000 / log.tick_rate
+    events = log.events()
+    pending = next(events, None)
+    while tetris.frame < log.frames:
+        actions = []
+        while pending is not None and pending[0] == tetris.frame:
+            actions.append(pending[1])
+            pending = next(events, None)
+        tetris.step(actions, dt)
+    return tetris
+
+
+def main():
+    parser = argparse.ArgumentParser(description="回放俄罗斯方块录像并校验分数")
+    parser.add_argument("paths", nargs='+', help="录像文件(.trpl)")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default='grid')
+    parser.add_argument("--json", action="store_true", help="以JSON输出汇总结果")
+    args = parser.parse_args()
+
+    engine = ENGINES[args.engine]
+    logs = [InputLog.load(path) for path in args.paths]
+    mismatches = []
+    frames = 0
+
+    start = time.perf_counter()
+    for path, log in zip(args.paths, logs):
+        tetris = replay(log, engine)
+        frames += tetris.frame
+        if (tetris.score, tetris.lines_cleared) != (log.score, log.lines_cleared):
+            mismatches.append({'path': path, 'expected': [log.score, log.lines_cleared],
+                               'actual': [tetris.score, tetris.lines_cleared]})
+    elapsed = time.perf_counter() - start
+
+    summary = {
+        'engine': args.engine,
+        'games': len(logs),
+        'frames': frames,
+        'seconds': elapsed,
+        'frames_per_second': frames / elapsed if elapsed else 0.0,
+        'mismatches': mismatches,
+    }
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        for mismatch in mismatches:
+            print(f"❌ {mismatch['path']}: 期望 分数/行数 {mismatch['expected']}, "
+                  f"实际 {mismatch['actual']}")
+        print(f"回放 {len(logs)} 局, {frames} 帧, 用时 {elapsed:.3f} 秒 "
+              f"({summary['frames_per_second']:.0f} 帧/秒), {len(mismatches)} 局不一致")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+# Voice bird: fly a bird through pipes with your voice.
+#
+# One package behind both game scripts (voice_bird_game.py and
+# simple_voice_bird.py, in voice_bird_game/ and voice_controlled_bird_assignment/):
+#
+#   controls          control schemes: pitch -> height, or volume -> climb/fall
+#   sim               game logic without pygame, bots and the batch simulator
+#   game, render      the pygame loop and drawing
+#   analysis          the audio analysis run on every window (noise floor, pitch)
+#   voicing           silence / noise / voiced classification in front of pitch
+#   pitch_filter      smoothing and latency prediction of the pitch, and its benchmark
+#   audio_capture     microphone/file capture and sliding analysis windows
+#   audio_channel, audio_process, audio_sources, noise_floor, pitch_detection
+#   bench             analysis throughput and allocation benchmark
+#
+# Run with `python -m voice_bird [--control volume]`. Names below are loaded on
+# first use, so importing the package pulls in neither pygame nor the pitch
+# detectors.
+
+_EXPORTS = {
+    'main': 'game',
+    'BirdGame': 'sim',
+    'CONTROLS': 'controls',
+    'Difficulty': 'controls',
+    'Layout': 'controls',
+    'PitchControl': 'controls',
+    'VolumeControl': 'controls',
+    'create_control': 'controls',
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    return getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
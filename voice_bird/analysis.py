@@ -0,0 +1,75 @@
+from .audio_capture import DEFAULT_HOP, DEFAULT_RATE
+from .noise_floor import NoiseFloor, relative_threshold
+from .voicing import VOICED, VoicingDetector
+
+# The audio analysis shared by every control scheme. AudioCapture hands each
+# overlapping float32 window and its RMS volume to analyze_audio, which keeps the
+# noise floor up to date and, when a pitch detector is set up and the window is
+# loud enough and classified as voiced (voicing.py), estimates the pitch and its
+# confidence. The volume-controlled game sets up neither stage, and
+# pitch_detection (with its FFT setup) is never imported for it.
+#
+# The state lives in module globals so that analyze_audio can be handed to a
+# separate audio process (audio_process.py), where init_analysis runs again.
+
+ANALYSIS_THRESHOLD = 100  # Pitch detection is skipped below this volume (see noise_floor)
+PITCH_METHOD = 'yin'      # Default backend: 'yin', 'hps' or 'fft' (see pitch_detection.py)
+PITCH_METHODS = ('fft', 'hps', 'yin')  # pitch_detection.DETECTORS, without importing it
+
+pitch_detector = None
+voicing_detector = None
+noise_floor = NoiseFloor(DEFAULT_HOP / DEFAULT_RATE)
+
+
+def init_analysis(method, rate, chunk, hop, fixed_floor=None, voicing=True):
+    """Create the pitch detector (None: volume only), the voicing stage in front of
+    it (voicing=False: volume gate only) and the noise floor used by analyze_audio
+    (also called in the audio process)"""
+    global pitch_detector, voicing_detector, noise_floor
+    pitch_detector = voicing_detector = None
+    if method is not None:
+        from .pitch_detection import create_detector
+        pitch_detector = create_detector(method, rate, chunk)
+        if voicing:
+            voicing_detector = VoicingDetector(rate, chunk)
+    noise_floor = NoiseFloor(hop / rate, fixed=fixed_floor)
+
+
+def analyze_audio(frame, volume):
+    """Analyze one float32 window with its RMS volume (both from AudioCapture) to
+    extract pitch, pitch confidence (0-1), volume and the current noise floor"""
+    noise_floor.update(volume)
+    floor = noise_floor.floor
+
+    # Pitch detection with the selected backend (80-1000 Hz, human voice range)
+    pitch = 0
+    confidence = 0.0
+    if pitch_detector is not None:
+        gate = relative_threshold(ANALYSIS_THRESHOLD, floor)
+        if voicing_detector is not None:
+            # Skip quiet and noisy chunks entirely
+            kind, clarity = voicing_detector(frame, volume, gate)
+            voiced = kind == VOICED
+        else:
+            voiced, clarity = volume > gate, 1.0  # Skip quiet chunks entirely
+        if voiced:
+            pitch, _ = pitch_detector(frame)
+            if pitch > 0:
+                confidence = clarity
+
+    return pitch, confidence, volume, floor
+
+
+def report_pitch_cost():
+    """Print how chunks were classified and the per-chunk cost of the pitch detector"""
+    if pitch_detector is None:
+        return
+    if voicing_detector is not None:
+        voicing = voicing_detector.stats()
+        if voicing['windows']:
+            print(f"📊 Voicing: {voicing['voiced']} voiced, {voicing['noise']} noise, "
+                  f"{voicing['silence']} silence chunks, {voicing['mean_us']:.0f} µs mean")
+    stats = pitch_detector.stats()
+    if stats['chunks']:
+        print(f"📊 Pitch detection ({stats['method']}): {stats['chunks']} chunks, "
+              f"{stats['mean_us']:.0f} µs mean, {stats['max_us']:.0f} µs max per chunk")
@@ -0,0 +1,281 @@
+import threading
+import time
+
+import numpy as np
+
+# Microphone capture for the voice bird games.
+# Samples arrive in buffers of frames_per_buffer and are appended to a sliding
+# analysis window; every hop samples the newest window is analysed, so windows
+# overlap and a result is produced long before a whole window of fresh audio has
+# been recorded. Each result is published to a LatestValueChannel together with the
+# perf_counter() time at which its newest sample reached the microphone, which lets
+# the game measure the delay from microphone to bird movement.
+#
+# 'callback' mode uses PyAudio's non-blocking stream_callback (the driver thread
+# hands over each buffer as soon as it is filled); 'blocking' mode is the original
+# stream.read() loop in a background thread.
+#
+# With a source from audio_sources, no audio device (or PyAudio) is needed:
+# 'realtime' pacing replays it on a background thread at its sample rate, 'fast'
+# pacing leaves it to the game to pull audio with pump() once per frame.
+#
+# Incoming samples are converted once into a preallocated float32 buffer
+# (SlidingFrames). All windows completed by a buffer are taken as one strided view
+# of overlapping frames and their RMS is computed in a single einsum into a
+# preallocated output, so the steady state allocates no sample-sized arrays;
+# analyze(frame, volume) then gets a float32 view of each window and its RMS.
+#
+# With track_arrivals, feed() also records how far the gap between two buffers
+# strays from the buffer's own duration (arrival jitter), for the frame profiler.
+# Only input paced in real time (the microphone, 'realtime' pacing) is tracked:
+# with 'fast' pacing buffers come whenever the game loop pumps them.
+
+CAPTURE_MODES = ('callback', 'blocking')
+
+DEFAULT_RATE = 44100
+DEFAULT_FRAMES_PER_BUFFER = 256
+DEFAULT_WINDOW = 1024
+DEFAULT_HOP = 256
+
+
+def window_delay(window, rate):
+    """Seconds by which the centre of a window lags its newest sample"""
+    return window / 2 / rate
+
+
+class SlidingFrames:
+    """Float32 history of the newest samples, cut into overlapping windows every hop.
+
+    Window ends stay at window + k * hop in the buffer, so one strided view with a
+    row per window (built once) covers every window the buffer can hold."""
+
+    def __init__(self, window, hop, capacity=4096):
+        self.window = window
+        self.hop = hop
+        self.end = window           # Zeros before the first real window, as before
+        self.since_hop = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        rows = -(-capacity // self.hop)
+        samples = np.zeros(self.window + rows * self.hop, dtype=np.float32)
+        if hasattr(self, 'samples'):
+            samples[:self.end] = self.samples[:self.end]
+        self.samples = samples
+        self.rows = np.lib.stride_tricks.as_strided(
+            samples, shape=(rows + 1, self.window),
+            strides=(self.hop * samples.itemsize, samples.itemsize), writeable=False)
+        self.volumes = np.zeros(rows + 1, dtype=np.float32)
+
+    def _make_room(self, count):
+        if self.end + count <= len(self.samples):
+            return
+        # Keep the last complete window and the samples after it, moved to row 0
+        start = self.end - self.since_hop - self.window
+        keep = self.end - start
+        self.samples[:keep] = self.samples[start:self.end]
+        self.end = keep
+        if self.end + count > len(self.samples):
+            # A larger buffer than ever before: grow once, then reuse
+            self._allocate(self.since_hop + count)
+
+    def push(self, samples):
+        """Append int16 samples; returns (frames, volumes, ends): a 2-D view of every
+        window completed, their RMS and each window's end offset in samples"""
+        count = len(samples)
+        self._make_room(count)
+        start = self.end
+        self.samples[start:start + count] = samples    # Cast in place, no temporary
+        self.end += count
+        boundary = start - self.since_hop               # End of the last window so far
+        done = (self.end - boundary) // self.hop
+        self.since_hop = (self.end - boundary) % self.hop
+        if done == 0:
+            return None, None, None
+        first = (boundary - self.window) // self.hop + 1
+        frames = self.rows[first:first + done]
+        volumes = self.volumes[:done]
+        np.einsum('ij,ij->i', frames, frames, out=volumes)
+        volumes *= 1 / self.window
+        np.sqrt(volumes, out=volumes)
+        offset = boundary + self.hop - start
+        return frames, volumes, range(offset, offset + done * self.hop, self.hop)
+
+
+class AudioCapture:
+    """Sliding-window capture: analyze(frame, volume) -> tuple, published as
+    tuple + (captured_at,); frame is a float32 window, volume its RMS"""
+
+    def __init__(self, analyze, channel, mode='callback', rate=DEFAULT_RATE,
+                 frames_per_buffer=DEFAULT_FRAMES_PER_BUFFER, window=DEFAULT_WINDOW,
+                 hop=DEFAULT_HOP, source=None, pacing='realtime', track_arrivals=False):
+        if mode not in CAPTURE_MODES:
+            raise ValueError(f"unknown capture mode: {mode}")
+        if not 0 < hop <= window:
+            raise ValueError("hop must be between 1 and the window size")
+        self.analyze = analyze
+        self.channel = channel
+        self.mode = mode
+        self.source = source
+        self.pacing = pacing
+        self.rate = source.rate if source is not None else rate
+        self.frames_per_buffer = frames_per_buffer
+        self.window = window
+        self.hop = hop
+        self.frames = SlidingFrames(window, hop)
+        self.input_latency = 0.0
+        self.pyaudio = None
+        self.stream = None
+        self.running = False
+        self.finished = False   # Set once a source has run out of samples
+        self.track_arrivals = track_arrivals
+        self.paced = source is None or pacing == 'realtime'
+        self.arrivals = LatencyMeter(4096) if track_arrivals and self.paced else None
+        self.last_arrival = None
+
+    def feed(self, samples, end_time):
+        """Append int16 samples whose last one was captured at end_time, analysing every hop"""
+        if self.arrivals is not None:
+            if self.last_arrival is not None:
+                self.arrivals.add(abs(end_time - self.last_arrival - len(samples) / self.rate))
+            self.last_arrival = end_time
+        frames, volumes, ends = self.frames.push(samples)
+        if frames is None:
+            return
+        count = len(samples)
+        for frame, volume, end in zip(frames, volumes.tolist(), ends):
+            captured_at = end_time - (count - end) / self.rate
+            self.channel.put(self.analyze(frame, volume) + (captured_at,))
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        import pyaudio
+
+        now = time.perf_counter()
+        # Age of the newest sample in this buffer, from the stream clock if the host
+        # API reports it, otherwise the latency the driver announced for the stream
+        adc_time = time_info.get('input_buffer_adc_time', 0.0)
+        if adc_time > 0:
+            age = time_info['current_time'] - adc_time - frame_count / self.rate
+        else:
+            age = self.input_latency
+        self.feed(np.frombuffer(in_data, dtype=np.int16), now - max(0.0, age))
+        return None, pyaudio.paContinue
+
+    def _read_loop(self):
+        try:
+            while self.running:
+                data = self.stream.read(self.frames_per_buffer, exception_on_overflow=False)
+                self.feed(np.frombuffer(data, dtype=np.int16),
+                          time.perf_counter() - self.input_latency)
+        except Exception as e:
+            print(f"Audio error: {e}")
+
+    def _source_loop(self):
+        # Hand out one buffer at a time, on the schedule a microphone would
+        start = time.perf_counter()
+        while self.running:
+            block = self.source.read(self.frames_per_buffer)
+            if len(block) == 0:
+                break
+            due = start + self.source.position / self.rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self.feed(block, time.perf_counter())
+        self.finished = True
+
+    def pump(self, count):
+        """Fast pacing: feed the next count samples now; False once the source is exhausted"""
+        block = self.source.read(count)
+        if len(block) == 0:
+            self.finished = True
+            return False
+        self.feed(block, time.perf_counter())
+        return True
+
+    def start(self):
+        """Open the default input device (or the source) and start capturing"""
+        if self.source is not None:
+            print(f"🎵 Audio input: {self.source.describe()}, {self.pacing} pacing")
+            self.running = True
+            if self.pacing == 'realtime':
+                threading.Thread(target=self._source_loop, daemon=True).start()
+            return
+
+        import pyaudio
+
+        self.pyaudio = pyaudio.PyAudio()
+        default_input = self.pyaudio.get_default_input_device_info()
+        print(f"🎤 Using audio device: {default_input['name']}")
+        self.stream = self.pyaudio.open(
+            format=pyaudio.paInt16, channels=1, rate=self.rate, input=True,
+            input_device_index=default_input['index'],
+            frames_per_buffer=self.frames_per_buffer,
+            stream_callback=self._callback if self.mode == 'callback' else None)
+        self.input_latency = self.stream.get_input_latency()
+        self.running = True
+        if self.mode == 'callback':
+            self.stream.start_stream()
+        else:
+            threading.Thread(target=self._read_loop, daemon=True).start()
+        print(f"🎤 {self.mode} capture: {self.frames_per_buffer} frames/buffer, "
+              f"{self.window}-sample window, hop {self.hop} at {self.rate} Hz, "
+              f"driver input latency {self.input_latency * 1000:.1f} ms")
+
+    def stop(self):
+        self.running = False
+        try:
+            if self.stream is not None:
+                self.stream.stop_stream()
+                self.stream.close()
+        except Exception:
+            pass
+        if self.pyaudio is not None:
+            self.pyaudio.terminate()
+        self.stream = None
+        self.pyaudio = None
+
+    def window_delay(self):
+        """Half the analysis window: how far the window's centre lags its newest sample"""
+        return window_delay(self.window, self.rate)
+
+    def report_arrivals(self):
+        """Print the buffer arrival jitter recorded with track_arrivals"""
+        if self.track_arrivals and not self.paced:
+            print("📊 Audio buffer arrival jitter: n/a (fast pacing, buffers follow the frame loop)")
+            return
+        arrivals = self.arrivals.summary() if self.arrivals is not None else {'count': 0}
+        if arrivals['count']:
+            print(f"📊 Audio buffer arrival jitter ({arrivals['count']} buffers): "
+                  f"{arrivals['p50_ms']:.2f} ms p50, {arrivals['p95_ms']:.2f} ms p95, "
+                  f"{arrivals['p99_ms']:.2f} ms p99, {arrivals['max_ms']:.2f} ms max")
+
+
+class LatencyMeter:
+    """Keeps the most recent latency measurements (seconds) in a fixed array"""
+
+    def __init__(self, size=1024):
+        self.samples = np.zeros(size)
+        self.count = 0
+        self.last = 0.0
+
+    def add(self, seconds):
+        self.samples[self.count % len(self.samples)] = seconds
+        self.count += 1
+        self.last = seconds
+
+    def summary(self):
+        """Mean and percentiles in milliseconds over the kept measurements"""
+        if not self.count:
+            return {'count': 0}
+        recent = self.samples[:min(self.count, len(self.samples))] * 1000
+        p50, p95, p99 = np.percentile(recent, [50, 95, 99])
+        return {
+            'count': self.count,
+            'mean_ms': float(recent.mean()),
+            'stdev_ms': float(recent.std()),
+            'p50_ms': float(p50),
+            'p95_ms': float(p95),
+            'p99_ms': float(p99),
+            'max_ms': float(recent.max()),
+        }
@@ -0,0 +1,44 @@
+# Single-producer / single-consumer channel between the audio thread and the game loop.
+# The audio thread writes every analysed chunk into a small preallocated ring buffer,
+# overwriting the oldest entry when the game does not keep up (paused, blocked, slow
+# frame). The game only ever wants the newest value, so it reads one slot per frame
+# instead of draining a queue. No locks are needed: the producer fills a slot before
+# publishing it by bumping the write counter, and only the consumer touches the read
+# counter. Memory stays constant however long the game is paused.
+
+DEFAULT_CAPACITY = 4
+
+
+class LatestValueChannel:
+    """Fixed-size ring buffer with an overwrite-oldest policy"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        if capacity < 2:
+            raise ValueError("capacity must be at least 2")
+        self.capacity = capacity
+        self.slots = [None] * capacity
+        self.written = 0    # Only changed by the producer
+        self.read = 0       # Only changed by the consumer
+        self.dropped = 0    # Values that were overwritten or skipped without being read
+
+    def put(self, value):
+        """Producer side: store a value, never blocks"""
+        self.slots[self.written % self.capacity] = value
+        self.written += 1
+
+    def latest(self):
+        """Consumer side: newest unread value, or None if nothing new arrived"""
+        written = self.written
+        unread = written - self.read
+        if unread == 0:
+            return None
+        self.dropped += unread - 1
+        self.read = written
+        return self.slots[(written - 1) % self.capacity]
+
+    def pending(self):
+        """Number of values written since the last read"""
+        return self.written - self.read
+
+    def stats(self):
+        return {'written': self.written, 'dropped': self.dropped, 'capacity': self.capacity}
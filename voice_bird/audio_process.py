@@ -0,0 +1,160 @@
+import multiprocessing
+import struct
+from multiprocessing import shared_memory
+
+from .audio_capture import DEFAULT_RATE, DEFAULT_WINDOW, AudioCapture, window_delay
+
+# Audio capture and analysis in a separate process, so heavy pitch detection
+# never holds the game's GIL. The child process runs the usual AudioCapture and
+# publishes every result into a tiny shared-memory block:
+#
+#   offset 0   uint64  sequence number (odd while a write is in progress)
+#   offset 8   float64 x fields (the game: pitch, confidence, volume, floor, captured_at)
+#
+# This is a seqlock: the writer bumps the sequence to odd, writes the values and
+# bumps it to even again; the reader retries if the sequence was odd or changed
+# while it was reading. A writer killed in the middle of a write leaves the
+# sequence odd forever, so the reader gives up after READ_RETRIES attempts (a
+# write takes microseconds) and AudioProcess.finished reports the dead child. The
+# game reads it through the same latest()/stats() interface as LatestValueChannel.
+# captured_at stays comparable between the two processes because
+# time.perf_counter() is a system-wide monotonic clock.
+
+SEQUENCE = struct.Struct('<Q')
+READ_RETRIES = 1000
+
+
+class SharedResultChannel:
+    """Latest-value channel backed by a fixed struct in shared memory"""
+
+    def __init__(self, fields, name=None):
+        self.values = struct.Struct('<' + 'd' * fields)
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner,
+                                              size=SEQUENCE.size + self.values.size)
+        self.buf = self.shm.buf
+        if self.owner:
+            SEQUENCE.pack_into(self.buf, 0, 0)
+        self.sequence = 0   # Writer side
+        self.written = 0    # Reader side: results seen so far
+        self.read = 0
+        self.dropped = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def put(self, value):
+        """Writer side (child process)"""
+        self.sequence += 1
+        SEQUENCE.pack_into(self.buf, 0, self.sequence)
+        self.values.pack_into(self.buf, SEQUENCE.size, *value)
+        self.sequence += 1
+        SEQUENCE.pack_into(self.buf, 0, self.sequence)
+
+    def latest(self):
+        """Reader side: newest unread result, or None if nothing new arrived (or no
+        consistent value could be read)"""
+        for _ in range(READ_RETRIES):
+            before = SEQUENCE.unpack_from(self.buf, 0)[0]
+            if before & 1:
+                continue
+            value = self.values.unpack_from(self.buf, SEQUENCE.size)
+            if SEQUENCE.unpack_from(self.buf, 0)[0] == before:
+                break
+        else:
+            return None
+        self.written = before // 2
+        unread = self.written - self.read
+        if unread == 0:
+            return None
+        self.dropped += unread - 1
+        self.read = self.written
+        return value
+
+    def pending(self):
+        return SEQUENCE.unpack_from(self.buf, 0)[0] // 2 - self.read
+
+    def stats(self):
+        return {'written': self.written, 'dropped': self.dropped, 'capacity': 1}
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _capture_main(channel_name, fields, stop_event, analyze, setup, setup_args,
+                  report, capture_kwargs):
+    # Entry point of the audio process
+    channel = SharedResultChannel(fields, channel_name)
+    if setup is not None:
+        setup(*setup_args)
+    capture = AudioCapture(analyze, channel, **capture_kwargs)
+    try:
+        capture.start()
+    except Exception as e:
+        print(f"Audio error: {e}")
+    else:
+        while not stop_event.wait(0.05) and not capture.finished:
+            pass
+        capture.stop()
+        if report is not None:
+            report()
+        if capture.arrivals is not None:
+            capture.report_arrivals()
+    channel.close()
+
+
+class AudioProcess:
+    """Runs AudioCapture(analyze, ...) in a child process; same start/stop/finished
+    interface as AudioCapture, results in self.channel.
+
+    analyze, setup and report must be module-level functions so the child can import
+    them; setup(*setup_args) runs in the child before capturing (e.g. to build the
+    pitch detector), report() runs there after capturing stops."""
+
+    def __init__(self, analyze, fields, setup=None, setup_args=(), report=None,
+                 **capture_kwargs):
+        # 'spawn' so the child does not inherit pygame's window and threads
+        self.context = multiprocessing.get_context('spawn')
+        self.channel = SharedResultChannel(fields)
+        self.stop_event = self.context.Event()
+        source = capture_kwargs.get('source')
+        self.has_source = source is not None
+        self.rate = source.rate if source is not None else capture_kwargs.get('rate', DEFAULT_RATE)
+        self.window = capture_kwargs.get('window', DEFAULT_WINDOW)
+        self.process = self.context.Process(
+            target=_capture_main, daemon=True,
+            args=(self.channel.name, fields, self.stop_event, analyze, setup, setup_args,
+                  report, capture_kwargs))
+
+    def window_delay(self):
+        """Half the analysis window, as AudioCapture.window_delay()"""
+        return window_delay(self.window, self.rate)
+
+    @property
+    def crashed(self):
+        """The child died (killed, or an uncaught error) instead of exiting cleanly"""
+        return self.process.exitcode not in (None, 0)
+
+    @property
+    def finished(self):
+        # A replayed input ends by itself; the microphone only stops when asked to
+        # (or when the child dies)
+        return (self.has_source and not self.process.is_alive()) or self.crashed
+
+    def start(self):
+        self.process.start()
+        print(f"🧵 Audio analysis running in process {self.process.pid}")
+
+    def stop(self):
+        # Event.set() waits for the waiting child to wake up, which a killed child never does
+        if self.process.is_alive():
+            self.stop_event.set()
+            self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.channel.close()
@@ -0,0 +1,126 @@
+import wave
+
+import numpy as np
+
+# Non-microphone audio inputs for the voice bird games: WAV files and generated
+# sine / chirp / noise signals. A source hands out int16 mono samples on request
+# with read(count) and returns an empty array once it is exhausted. AudioCapture
+# either replays a source in real time on a background thread (like a microphone)
+# or lets the game pull exactly one frame of audio per game frame, which makes a
+# whole game deterministic and runnable without a sound card.
+
+DEFAULT_RATE = 44100
+DEFAULT_DURATION = 30.0     # Seconds of generated signal
+DEFAULT_AMPLITUDE = 3000    # Comfortably above the games' volume thresholds
+LEAD_IN_SECONDS = 2.0       # Quiet room noise before a generated signal starts,
+LEAD_IN_AMPLITUDE = 20      # long enough for the games' noise floor calibration
+
+PACING_MODES = ('realtime', 'fast')
+
+SOURCE_HELP = ("audio input: 'mic' (default), a .wav file, 'sine[:HZ]', "
+               "'chirp[:START_HZ:END_HZ]' or 'noise'")
+
+
+class SampleSource:
+    """Base class: subclasses implement read(count)"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.position = 0   # Samples handed out so far
+
+    def read(self, count):
+        raise NotImplementedError
+
+    def describe(self):
+        return type(self).__name__
+
+
+class WavSource(SampleSource):
+    """16-bit PCM WAV file, mixed down to mono"""
+
+    def __init__(self, path):
+        self.path = path
+        with wave.open(path, 'rb') as f:
+            if f.getsampwidth() != 2:
+                raise ValueError(f"{path}: only 16-bit PCM WAV files are supported")
+            channels = f.getnchannels()
+            super().__init__(f.getframerate())
+            frames = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+        if channels > 1:
+            frames = frames.reshape(-1, channels).mean(axis=1).astype(np.int16)
+        self.samples = frames
+
+    def read(self, count):
+        block = self.samples[self.position:self.position + count]
+        self.position += len(block)
+        return block
+
+    def describe(self):
+        return f"WAV file {self.path} ({len(self.samples) / self.rate:.1f} s at {self.rate} Hz)"
+
+
+class SignalSource(SampleSource):
+    """Generated 'sine', 'chirp' (linear sweep from frequency to end_frequency) or 'noise'"""
+
+    def __init__(self, kind, rate=DEFAULT_RATE, duration=DEFAULT_DURATION, frequency=440.0,
+                 end_frequency=None, amplitude=DEFAULT_AMPLITUDE, noise=0.0, seed=0,
+                 lead_in=LEAD_IN_SECONDS):
+        if kind not in ('sine', 'chirp', 'noise'):
+            raise ValueError(f"unknown signal: {kind}")
+        super().__init__(rate)
+        self.kind = kind
+        self.lead_in = int(lead_in * rate)
+        self.length = int(duration * rate)
+        self.total = self.lead_in + self.length
+        self.frequency = frequency
+        self.end_frequency = frequency if end_frequency is None else end_frequency
+        self.amplitude = amplitude
+        self.noise = noise
+        self.rng = np.random.default_rng(seed)
+
+    def read(self, count):
+        count = max(0, min(count, self.total - self.position))
+        # Time since the end of the lead-in (negative during it)
+        t = (self.position - self.lead_in + np.arange(count)) / self.rate
+        self.position += count
+        if self.kind == 'noise':
+            signal = self.amplitude * self.rng.standard_normal(count)
+        else:
+            # Phase of a linear sweep; a sine is a sweep with equal start and end
+            sweep = (self.end_frequency - self.frequency) / (self.length / self.rate)
+            phase = 2 * np.pi * (self.frequency * t + 0.5 * sweep * t * t)
+            signal = self.amplitude * np.sin(phase)
+            if self.noise:
+                signal += self.amplitude * self.noise * self.rng.standard_normal(count)
+        quiet = t < 0
+        if quiet.any():
+            signal[quiet] = LEAD_IN_AMPLITUDE * self.rng.standard_normal(quiet.sum())
+        return np.clip(signal, -32768, 32767).astype(np.int16)
+
+    def describe(self):
+        if self.kind == 'chirp':
+            detail = f" {self.frequency:g}-{self.end_frequency:g} Hz"
+        elif self.kind == 'sine':
+            detail = f" {self.frequency:g} Hz"
+        else:
+            detail = ""
+        return (f"{self.kind}{detail} ({self.lead_in / self.rate:.1f} s quiet lead-in, "
+                f"{self.length / self.rate:.1f} s at {self.rate} Hz)")
+
+
+def open_source(spec, rate=DEFAULT_RATE, duration=DEFAULT_DURATION, seed=0):
+    """Build a source from a command-line spec; returns None for the live microphone"""
+    if spec in (None, 'mic'):
+        return None
+    if spec.lower().endswith('.wav'):
+        return WavSource(spec)
+    kind, *params = spec.split(':')
+    values = [float(p) for p in params]
+    if kind == 'sine':
+        return SignalSource('sine', rate, duration, *values[:1], seed=seed)
+    if kind == 'chirp':
+        start, end = (values + [150.0, 700.0][len(values):])[:2]
+        return SignalSource('chirp', rate, duration, start, end, seed=seed)
+    if kind == 'noise':
+        return SignalSource('noise', rate, duration, seed=seed)
+    raise ValueError(f"unknown audio input: {spec}")
@@ -0,0 +1,163 @@
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+from . import analysis
+from .audio_capture import (AudioCapture, DEFAULT_FRAMES_PER_BUFFER, DEFAULT_HOP,
+                            DEFAULT_RATE, DEFAULT_WINDOW)
+from .audio_channel import LatestValueChannel
+from .audio_sources import SOURCE_HELP, open_source
+from .pitch_detection import DETECTORS
+
+# Throughput of the games' audio analysis: a whole input is pushed through the
+# same sliding-window AudioCapture the games use, as fast as possible, and the
+# result is reported as analysed windows per second and as a real-time factor
+# (seconds of audio analysed per second of wall time). Output is JSON.
+#
+# A second, slower pass feeds the input one microphone buffer at a time under
+# tracemalloc and sums, per buffer, how far allocations rose above the memory in
+# use before it (the peak of short-lived temporaries, so a lower bound), together
+# with the garbage collections that ran, per second of audio.
+#
+# Each analysis is also measured through ConcatenatingCapture, the per-buffer
+# path AudioCapture replaced (see 'concatenate' in the report), so the before and
+# after allocation rates come from the same run. Only the capture differs: the
+# detectors' own work arrays are the current ones in both.
+
+BLOCK = 4096    # Samples handed to the capture per feed() call
+
+
+class ConcatenatingCapture:
+    """The old way to window a stream, for comparison: every buffer is appended to
+    the int16 history with np.concatenate, and each window is sliced out of it, cast
+    to float32 and squared for its RMS, all in new arrays"""
+
+    def __init__(self, analyze, channel, window=DEFAULT_WINDOW, hop=DEFAULT_HOP, source=None):
+        self.analyze = analyze
+        self.channel = channel
+        self.window = window
+        self.hop = hop
+        self.rate = source.rate if source is not None else DEFAULT_RATE
+        self.history = np.zeros(window, dtype=np.int16)
+        self.since_hop = 0
+
+    def feed(self, samples, end_time):
+        count = len(samples)
+        history = np.concatenate((self.history, samples))
+        end = len(history) - count - self.since_hop + self.hop
+        while end <= len(history):
+            frame = history[end - self.window:end].astype(np.float32)
+            volume = float(np.sqrt(np.mean(frame ** 2)))
+            captured_at = end_time - (len(history) - end) / self.rate
+            self.channel.put(self.analyze(frame, volume) + (captured_at,))
+            end += self.hop
+        self.since_hop = (self.since_hop + count) % self.hop
+        self.history = history[-(self.window + self.since_hop):]
+
+
+def run(analyze, spec, duration, window, hop, seed, capture_class=AudioCapture):
+    source = open_source(spec, duration=duration, seed=seed)
+    channel = LatestValueChannel()
+    capture = capture_class(analyze, channel, window=window, hop=hop, source=source)
+    start = time.perf_counter()
+    while True:
+        block = source.read(BLOCK)
+        if len(block) == 0:
+            break
+        capture.feed(block, time.perf_counter())
+    elapsed = time.perf_counter() - start
+    audio_seconds = source.position / source.rate
+    return {
+        'windows': channel.written,
+        'seconds': elapsed,
+        'windows_per_sec': channel.written / elapsed if elapsed else 0.0,
+        'us_per_window': elapsed / max(channel.written, 1) * 1e6,
+        'realtime_factor': audio_seconds / elapsed if elapsed else 0.0,
+    }
+
+
+def allocations(analyze, spec, duration, window, hop, seed, frames_per_buffer,
+                capture_class=AudioCapture):
+    source = open_source(spec, duration=duration, seed=seed)
+    channel = LatestValueChannel()
+    capture = capture_class(analyze, channel, window=window, hop=hop, source=source)
+    transient = 0
+    collections = sum(stats['collections'] for stats in gc.get_stats())
+    tracemalloc.start()
+    while True:
+        block = source.read(frames_per_buffer)
+        if len(block) == 0:
+            break
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        capture.feed(block, 0.0)
+        transient += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    collections = sum(stats['collections'] for stats in gc.get_stats()) - collections
+    audio_seconds = source.position / source.rate
+    return {
+        'alloc_bytes_per_window': transient / max(channel.written, 1),
+        'alloc_kb_per_sec': transient / 1024 / audio_seconds,
+        'gc_collections_per_sec': collections / audio_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="analyze_audio throughput benchmark")
+    parser.add_argument("--input", default='chirp:150:700', help=SOURCE_HELP)
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="seconds of generated signal")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW)
+    parser.add_argument("--hop", type=int, default=DEFAULT_HOP)
+    parser.add_argument("--buffer", type=int, default=DEFAULT_FRAMES_PER_BUFFER,
+                        help="frames per feed() in the allocation pass, like a microphone buffer")
+    parser.add_argument("--pitch", choices=sorted(DETECTORS), action='append',
+                        help="pitch backend to test, may be repeated; default all")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-voicing", action="store_true",
+                        help="gate pitch detection on volume only, as before the voicing stage")
+    parser.add_argument("--output", help="write JSON to a file instead of stdout")
+    args = parser.parse_args()
+
+    source = open_source(args.input, duration=args.duration, seed=args.seed)
+    if source is None:
+        parser.error("the benchmark needs a file or generated input, not the microphone")
+
+    voicing = not args.no_voicing
+    report = {'input': source.describe(), 'window': args.window, 'hop': args.hop,
+              'voicing': voicing, 'analyze_audio': {}}
+    def measure(method, capture_class=AudioCapture):
+        analysis.init_analysis(method, source.rate, args.window, args.hop, voicing=voicing)
+        result = run(analysis.analyze_audio, args.input, args.duration, args.window,
+                     args.hop, args.seed, capture_class)
+        if method is not None:
+            # Windows below the noise gate or classified as noise skip pitch detection altogether
+            result['pitch_detected'] = analysis.pitch_detector.calls
+            if analysis.voicing_detector is not None:
+                result['voicing'] = analysis.voicing_detector.stats()
+        analysis.init_analysis(method, source.rate, args.window, args.hop, voicing=voicing)
+        result.update(allocations(analysis.analyze_audio, args.input, args.duration,
+                                  args.window, args.hop, args.seed, args.buffer, capture_class))
+        return result
+
+    for method in args.pitch or sorted(DETECTORS):
+        report['analyze_audio'][method] = measure(method)
+        report['analyze_audio'][method]['concatenate'] = measure(method, ConcatenatingCapture)
+    # The volume control's analysis: no pitch detector, only the noise floor
+    report['analyze_volume'] = measure(None)
+    report['analyze_volume']['concatenate'] = measure(None, ConcatenatingCapture)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
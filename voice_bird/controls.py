@@ -0,0 +1,122 @@
+from .noise_floor import relative_threshold
+
+# Control schemes of the voice bird game.
+# A control scheme turns the newest audio result (pitch, volume, noise floor) into
+# bird movement and brings the world it was tuned for: screen and sprite geometry
+# (Layout) and obstacle settings (Difficulty).
+#
+#   'pitch'   the bird flies to a height given by the sung pitch (voice_bird_game.py)
+#   'volume'  making any sound pushes the bird up, silence lets it fall
+#             (simple_voice_bird.py); no pitch detection is needed
+#
+# Movement is defined per 60 FPS frame, the rate everything was tuned at, and
+# scaled by the elapsed time dt in milliseconds. The pitch comes with a confidence
+# from 0 to 1 (see voicing.py); doubtful estimates only nudge the target height.
+
+FRAME_MS = 1000 / 60
+
+PITCH_LOW = 80          # Pitch mapped to the bottom / top of the flight range
+PITCH_HIGH = 800
+
+
+class Layout:
+    """Screen and sprite geometry in pixels"""
+
+    def __init__(self, width=1200, height=600, bird_x=150, bird_size=20, obstacle_width=60,
+                 gap_margin=200):
+        self.width = width
+        self.height = height
+        self.bird_x = bird_x
+        self.bird_size = bird_size
+        self.obstacle_width = obstacle_width
+        self.gap_margin = gap_margin    # Gap centres stay this far from the top and bottom
+
+
+class Difficulty:
+    """Tunable settings; speed in pixels per 60 FPS frame, spawn interval in ms"""
+
+    def __init__(self, gap_size=380, speed=2.8, spawn_interval=2700):
+        self.gap_size = gap_size
+        self.speed = speed
+        self.spawn_interval = spawn_interval
+
+    def as_dict(self):
+        return {'gap_size': self.gap_size, 'speed': self.speed,
+                'spawn_interval': self.spawn_interval}
+
+
+def pitch_to_y(pitch, height=600):
+    """Target height for a pitch: high pitch -> top of the screen"""
+    normalized_pitch = max(0, min(1, (pitch - PITCH_LOW) / (PITCH_HIGH - PITCH_LOW)))
+    return height - 100 - (normalized_pitch * (height - 200))
+
+
+def y_to_pitch(y, height=600):
+    """Pitch that sends the bird to height y (inverse of pitch_to_y)"""
+    normalized_pitch = (height - 100 - y) / (height - 200)
+    return PITCH_LOW + normalized_pitch * (PITCH_HIGH - PITCH_LOW)
+
+
+class PitchControl:
+    """High pitch -> fly high, low pitch -> fly low, no sound -> stay still"""
+
+    name = 'pitch'
+    title = "Voice-Controlled Flying Bird Game"
+    uses_pitch = True
+    layout = Layout()
+    MOVE_THRESHOLD = 80     # Bird follows the pitch above this volume (see noise_floor)
+    RESPONSE = 0.4          # Fraction of the way to the target height per frame
+    FULL_CONFIDENCE = 0.5   # Pitches at least this confident set the target outright
+
+    def difficulty(self):
+        return Difficulty(gap_size=380, speed=2.8, spawn_interval=2700)
+
+    def response_factor(self, dt):
+        """Smoothing factor for dt milliseconds, RESPONSE per FRAME_MS"""
+        return 1 - (1 - self.RESPONSE) ** (dt / FRAME_MS)
+
+    def move(self, bird, pitch, volume, floor, dt, confidence=1.0):
+        if volume > relative_threshold(self.MOVE_THRESHOLD, floor):  # Easier to trigger than the analysis gate
+            # Adjust target height based on pitch, weighted by its confidence
+            if pitch > 0:
+                target_y = pitch_to_y(pitch, self.layout.height)
+                if confidence < self.FULL_CONFIDENCE:
+                    target_y = bird.target_y + (target_y - bird.target_y) * (
+                        confidence / self.FULL_CONFIDENCE)
+                bird.target_y = target_y
+
+            # Smooth movement to target position, at the same rate whatever the frame rate
+            diff = bird.target_y - bird.y
+            bird.y += diff * self.response_factor(dt)
+
+
+class VolumeControl:
+    """Make a sound to fly up, stay quiet to fall down"""
+
+    name = 'volume'
+    title = "Simple Voice Bird"
+    uses_pitch = False
+    layout = Layout(width=800, bird_x=100, bird_size=15, obstacle_width=50, gap_margin=180)
+    FLY_THRESHOLD = 150     # Bird climbs above this volume (see noise_floor)
+    CLIMB = -2.5            # Pixels per frame
+    FALL = 1.5
+
+    def difficulty(self):
+        # The gap is measured between the pipes and the edge of the bird, 280 leaves
+        # the same room as the 250 the simple game used to test against its centre
+        return Difficulty(gap_size=280, speed=2.6, spawn_interval=2900)
+
+    def flying(self, volume, floor):
+        return volume > relative_threshold(self.FLY_THRESHOLD, floor)
+
+    def move(self, bird, pitch, volume, floor, dt, confidence=1.0):
+        dy = self.CLIMB if self.flying(volume, floor) else self.FALL
+        bird.y += dy * dt / FRAME_MS
+
+
+CONTROLS = {cls.name: cls for cls in (PitchControl, VolumeControl)}
+
+
+def create_control(name):
+    """Build a control scheme by name: 'pitch' or 'volume'"""
+    return CONTROLS[name]()
@@ -0,0 +1,445 @@
+import argparse
+import random
+import time
+
+import pygame
+
+from .analysis import (PITCH_METHOD, PITCH_METHODS, analyze_audio, init_analysis,
+                       report_pitch_cost)
+from .audio_capture import (AudioCapture, LatencyMeter, CAPTURE_MODES,
+                            DEFAULT_FRAMES_PER_BUFFER)
+from .audio_channel import LatestValueChannel
+from .audio_sources import PACING_MODES, SOURCE_HELP, DEFAULT_DURATION, open_source
+from .controls import CONTROLS, Difficulty, create_control
+from .noise_floor import relative_threshold
+from .render import BLUE, Background, GameUI, draw_bird, draw_obstacles
+from .sim import BirdGame, PitchTrace
+
+# The game loop shared by both variants: the control scheme picks the world
+# (Layout, Difficulty), how audio moves the bird and what the UI shows. Only the
+# modules the selected setup needs are imported: pitch_detection is loaded by
+# init_analysis and pitch_filter by main for the pitch control only,
+# audio_process with --audio-process.
+#
+# With the pitch control, pitches pass through a filter (pitch_filter.py) on their
+# way from the audio channel to the bird. Each new pitch is stamped with the time
+# its analysis window is centred on, and every frame asks for the pitch expected
+# when the frame will be on screen: the measured age of the audio plus the time
+# from the game step to the end of the flip, so the bird is where the voice is now
+# rather than where it was. With fast pacing the clock is the audio itself and no
+# display lead is added, which keeps a seeded replay deterministic.
+
+# Game settings (world size and difficulty come from the control scheme, physics from sim.py)
+FPS = 60
+
+# Audio settings (CHUNK is the analysis window; a new window is analysed every hop
+# samples, by default about once per frame: see frame_hop)
+RATE = 44100
+CHUNK = 1024
+FRAMES_PER_BUFFER = DEFAULT_FRAMES_PER_BUFFER
+
+# Audio analysis related variables
+audio_channel = LatestValueChannel()
+latency_meter = LatencyMeter()  # Microphone to bird movement on screen
+window_delay_ms = 0.0           # Newest sample of a window to its centre
+frame_meter = LatencyMeter()    # Time between frames, to measure jitter
+current_pitch = 0
+current_confidence = 0.0
+current_volume = 0
+current_floor = 0  # 0 while the noise floor is being calibrated
+pitch_filter = None     # None with the volume control, which ignores the pitch
+PITCH_FILTERS = ('kalman', 'none', 'one-euro')  # pitch_filter.FILTERS, without importing it
+display_lead_ms = 0.0   # Game step to end of flip, smoothed
+recorded = None         # (time_ms, pitch, volume, confidence) rows for --save-trace
+
+# Optional frame profiler (--profile, --profile-trace): frame_profiler.py at the
+# repository root, shared with tetris_game.py. The launchers put the root on
+# sys.path, as does running python -m voice_bird from it.
+# Phases in loop order; 'audio' is the channel read and pitch filter, plus with fast
+# pacing the pump right after the wait, which runs the whole window analysis
+PROFILE_PHASES = ('wait', 'event', 'audio', 'sim', 'render', 'flip')
+profiler = None
+profiler_hud = None
+profile_trace = None
+
+WELCOME = {
+    'pitch': ["🎤 Use your voice to control the bird:",
+              "   High pitch = fly high, Low pitch = fly low",
+              "   No sound = stay still"],
+    'volume': ["🎤 Make sound to fly up, stay quiet to fall down"],
+}
+
+
+def report_audio_stats(audio_mode):
+    """Print pitch detection cost, dropped chunks, latency and frame-time jitter"""
+    report_pitch_cost()
+    channel = audio_channel.stats()
+    if channel['written']:
+        print(f"📊 Audio channel: {channel['written']} chunks, {channel['dropped']} dropped")
+    latency = latency_meter.summary()
+    if latency['count']:
+        print(f"📊 Mic-to-bird latency: {latency['mean_ms']:.1f} ms mean, "
+              f"{latency['p50_ms']:.1f} ms p50, {latency['p95_ms']:.1f} ms p95, "
+              f"{latency['p99_ms']:.1f} ms p99, {latency['max_ms']:.1f} ms max (plus {window_delay_ms:.1f} ms "
+              f"to the centre of the analysis window)")
+    if pitch_filter is not None and pitch_filter.name != 'none':
+        print(f"📊 Pitch filter: {pitch_filter.name}, predicting to the window centre "
+              f"+ audio age + {display_lead_ms:.1f} ms to the end of the flip")
+    if current_floor:
+        print(f"📊 Noise floor: {current_floor:.1f} RMS, volume thresholds scaled "
+              f"x{relative_threshold(1, current_floor):.2f}")
+    frames = frame_meter.summary()
+    if frames['count']:
+        print(f"📊 Frame time (audio in {audio_mode}): {frames['mean_ms']:.2f} ms mean, "
+              f"{frames['stdev_ms']:.2f} ms jitter (stdev), {frames['p95_ms']:.2f} ms p95, "
+              f"{frames['max_ms']:.2f} ms max")
+
+
+def frame_hop(rate, frames_per_buffer, window):
+    """Hop of about one analysed window per game frame, in whole audio buffers (768
+    samples at the defaults). The game only reads the newest result each frame, so
+    analysing more often would mostly produce results that are never read"""
+    buffers = max(1, round(rate / FPS / frames_per_buffer))
+    return min(buffers * frames_per_buffer, window)
+
+
+def draw_profile(screen):
+    """Draw the profiler overlay (if shown) and close the frame's render phase"""
+    if profiler_hud:
+        profiler_hud.draw(screen)
+    profiler.mark('render')
+
+
+def report_profile(capture, audio_mode):
+    """Print the frame profile and arrival jitter, and save the trace if asked to"""
+    profiler.finish()
+    profiler.report()
+    if audio_mode == "thread":
+        capture.report_arrivals()  # The audio process prints its own
+    if profile_trace:
+        profiler.save(profile_trace)
+
+
+def save_trace(path):
+    """Write the pitches the game received as a PitchTrace CSV (see pitch_filter.py)"""
+    start = recorded[0][0] if recorded else 0.0
+    columns = list(zip(*recorded)) or [[], [], [], []]
+    trace = PitchTrace([t - start for t in columns[0]], *columns[1:])
+    trace.save(path)
+    print(f"📊 Pitch trace saved: {path} ({len(recorded)} samples)")
+
+
+def quit_game(capture, audio_mode, trace_path=None):
+    """Stop audio capture, print audio statistics and close the window"""
+    capture.stop()
+    report_audio_stats(audio_mode)
+    if profiler:
+        report_profile(capture, audio_mode)
+    if trace_path:
+        save_trace(trace_path)
+    pygame.quit()
+
+
+def main(control='pitch'):
+    """Main game loop; control is the default control scheme ('pitch' or 'volume')"""
+    global current_pitch, current_confidence, current_volume, current_floor, audio_channel
+    global RATE, CHUNK
+    global profiler, profiler_hud, profile_trace
+    global pitch_filter, display_lead_ms, recorded, window_delay_ms
+
+    parser = argparse.ArgumentParser(description="Voice-Controlled Flying Bird Game")
+    parser.add_argument("--control", choices=sorted(CONTROLS), default=control,
+                        help="fly to the sung pitch, or climb while making any sound")
+    parser.add_argument("--pitch", choices=PITCH_METHODS, default=PITCH_METHOD,
+                        help="pitch detection backend (pitch control only)")
+    parser.add_argument("--capture", choices=CAPTURE_MODES, default='callback',
+                        help="PyAudio stream_callback or blocking stream.read()")
+    parser.add_argument("--rate", type=int, default=RATE, help="sample rate in Hz")
+    parser.add_argument("--buffer", type=int, default=FRAMES_PER_BUFFER,
+                        help="frames per audio buffer")
+    parser.add_argument("--window", type=int, default=CHUNK, help="analysis window in samples")
+    parser.add_argument("--hop", type=int,
+                        help="samples between overlapping analysis windows (default: about "
+                             "one window per frame, in whole buffers)")
+    parser.add_argument("--input", default='mic', help=SOURCE_HELP)
+    parser.add_argument("--pacing", choices=PACING_MODES, default='realtime',
+                        help="play a non-microphone input in real time, or one game frame "
+                             "of audio per frame as fast as possible (deterministic)")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION,
+                        help="seconds of generated signal")
+    parser.add_argument("--seed", type=int, help="seed obstacles and generated noise")
+    parser.add_argument("--gap-size", type=int,
+                        help="obstacle gap in pixels (default depends on the control, "
+                             "see controls.py)")
+    parser.add_argument("--speed", type=float,
+                        help="obstacle speed in pixels per 60 FPS frame")
+    parser.add_argument("--spawn-interval", type=float,
+                        help="milliseconds between obstacles")
+    parser.add_argument("--audio-process", action="store_true",
+                        help="capture and analyse audio in a separate process")
+    parser.add_argument("--parallax", action="store_true",
+                        help="add a slower layer of distant clouds")
+    parser.add_argument("--noise-floor", type=float,
+                        help="fixed noise floor (RMS) instead of calibrating and tracking it")
+    parser.add_argument("--filter", choices=PITCH_FILTERS, default='kalman',
+                        help="smooth the pitch and predict it forward by the measured "
+                             "latency (pitch control only; 'none' uses each raw pitch)")
+    parser.add_argument("--save-trace", metavar="PATH",
+                        help="record the pitches the game receives as a CSV trace for "
+                             "python -m voice_bird.pitch_filter --trace")
+    parser.add_argument("--no-voicing", action="store_true",
+                        help="run pitch detection on every chunk above the volume gate, "
+                             "without the silence/noise/voiced classification")
+    parser.add_argument("--profile", action="store_true",
+                        help="show per-frame timings (wait/event/audio/sim/render/flip) and "
+                             "print p50/p95/p99 and audio arrival jitter on exit")
+    parser.add_argument("--profile-trace", metavar="PATH",
+                        help="save per-frame timings and audio queue depth as CSV "
+                             "(JSON for a .json path)")
+    args = parser.parse_args()
+    control = create_control(args.control)
+    difficulty = control.difficulty()
+    difficulty = Difficulty(difficulty.gap_size if args.gap_size is None else args.gap_size,
+                            difficulty.speed if args.speed is None else args.speed,
+                            difficulty.spawn_interval if args.spawn_interval is None
+                            else args.spawn_interval)
+    # One generator for every game, so a seeded session replays exactly
+    game = BirdGame(random.Random(args.seed), difficulty, control)
+    source = open_source(args.input, args.rate, args.duration, args.seed or 0)
+    fast = source is not None and args.pacing == 'fast'
+    if fast and args.audio_process:
+        parser.error("--audio-process needs real-time pacing")
+    RATE = source.rate if source is not None else args.rate
+    CHUNK = args.window
+    hop = args.hop if args.hop is not None else frame_hop(RATE, args.buffer, CHUNK)
+    # The volume control never looks at the pitch, so no detector or filter is set up for it
+    analysis_args = (args.pitch if control.uses_pitch else None, RATE, CHUNK, hop,
+                     args.noise_floor, not args.no_voicing)
+    init_analysis(*analysis_args)
+    if control.uses_pitch:
+        from .pitch_filter import create_filter
+        pitch_filter = create_filter(args.filter)
+    if args.save_trace:
+        recorded = []
+    profiling = args.profile or args.profile_trace is not None
+    if profiling:
+        try:
+            from frame_profiler import FrameProfiler, ProfilerHUD
+        except ImportError:
+            parser.error("--profile needs frame_profiler.py from the repository root on "
+                         "sys.path (start a launcher, or python -m voice_bird from the root)")
+    capture_options = dict(mode=args.capture, rate=RATE, frames_per_buffer=args.buffer,
+                           window=CHUNK, hop=hop, source=source, pacing=args.pacing,
+                           track_arrivals=profiling)
+    if args.audio_process:
+        from .audio_process import AudioProcess
+        # Results come back as (pitch, confidence, volume, floor, captured_at) in shared memory
+        audio_mode = "process"
+        capture = AudioProcess(analyze_audio, 5, setup=init_analysis,
+                               setup_args=analysis_args, report=report_pitch_cost,
+                               **capture_options)
+        audio_channel = capture.channel
+    else:
+        audio_mode = "thread"
+        capture = AudioCapture(analyze_audio, audio_channel, **capture_options)
+    window_delay_ms = capture.window_delay() * 1000
+
+    pygame.init()
+
+    layout = control.layout
+    screen = pygame.display.set_mode((layout.width, layout.height))
+    pygame.display.set_caption(f"🐦 {control.title}")
+    clock = pygame.time.Clock()
+    ui = GameUI(control)
+    background = Background(layout.width, parallax=args.parallax)
+    if profiling:
+        # Budget of a 60 FPS frame even with fast pacing, where the loop is uncapped
+        profiler = FrameProfiler(PROFILE_PHASES, values=('audio_queue',), fps=FPS)
+        profile_trace = args.profile_trace
+        if args.profile:
+            profiler_hud = ProfilerHUD(profiler, pygame.font.Font(None, 24),
+                                       position=(layout.width - 250, 10))
+
+    # Start audio capture
+    try:
+        capture.start()
+    except Exception as e:
+        print(f"Audio error: {e}")
+
+    print("🎮 Game started!")
+    for line in WELCOME[control.name]:
+        print(line)
+    print("🎯 Avoid the green obstacles!")
+    if args.noise_floor is None:
+        print("🤫 Stay quiet for a moment while the background noise is measured")
+
+    last_frame = time.perf_counter()
+    clock_ms = 0.0  # Audio time with fast pacing
+    while True:
+        # Initialize game objects (the obstacle pool is kept between games)
+        game.reset()
+        bird = game.bird
+        obstacles = game.obstacles
+        score = 0
+        game_over = False
+        paused = False  # Add pause state
+
+        print("🎮 New game started!")
+
+        # Main game loop
+        running = True
+        while running:
+            if profiler:
+                profiler.begin()
+            if fast:
+                # Uncapped frame rate, fixed time step and exactly one frame of audio
+                clock.tick()
+                dt = 1000 / FPS
+                if profiler:
+                    profiler.mark('wait')
+                capture.pump(RATE // FPS)
+                if profiler:
+                    profiler.mark('audio')
+            else:
+                dt = clock.tick(FPS)
+                if profiler:
+                    profiler.mark('wait')
+            now = time.perf_counter()
+            frame_meter.add(now - last_frame)
+            last_frame = now
+
+            if capture.finished:
+                if audio_mode == "process" and capture.crashed:
+                    print(f"Audio error: audio process exited with code "
+                          f"{capture.process.exitcode} - Score: {score}")
+                else:
+                    print(f"🎵 Audio input finished - Score: {score}")
+                quit_game(capture, audio_mode, args.save_trace)
+                return
+
+            # Handle events
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    quit_game(capture, audio_mode, args.save_trace)
+                    return
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        quit_game(capture, audio_mode, args.save_trace)
+                        return
+                    elif event.key == pygame.K_SPACE:
+                        if game_over:
+                            # Restart when game is over
+                            print("🔄 Restarting game...")
+                            running = False
+                            break
+                        else:
+                            # Pause/resume during gameplay
+                            paused = not paused
+                            if paused:
+                                print("⏸️ Game paused - Press SPACE to continue")
+                            else:
+                                print("▶️ Game resumed")
+            if profiler:
+                profiler.mark('event')
+
+            if game_over and fast:
+                # Nobody to press SPACE when replaying an input as fast as possible
+                print("🔄 Restarting game...")
+                running = False
+                continue
+
+            if game_over:
+                # Game over state, only draw UI
+                screen.fill(BLUE)
+                ui.draw(screen, score, current_pitch, current_volume, game_over=True, paused=False)
+                if profiler:
+                    draw_profile(screen)
+                pygame.display.flip()
+                if profiler:
+                    profiler.mark('flip')
+                continue
+
+            if paused:
+                # Paused state, only draw UI, don't update game logic
+                background.draw(screen, pygame.time.get_ticks())
+                draw_obstacles(screen, obstacles, layout.height)
+                draw_bird(screen, bird)
+                ui.draw(screen, score, current_pitch, current_volume, game_over=False, paused=True)
+                if profiler:
+                    draw_profile(screen)
+                pygame.display.flip()
+                if profiler:
+                    profiler.mark('flip')
+                continue
+
+            # Get the newest audio data (older unread chunks count as dropped)
+            if profiler:
+                profiler.record('audio_queue', audio_channel.pending())
+            sample = audio_channel.latest()
+            captured_at = None
+            if fast:
+                clock_ms += dt
+                now_ms = clock_ms
+            else:
+                now_ms = time.perf_counter() * 1000
+            if sample is not None:
+                (current_pitch, current_confidence, current_volume, current_floor,
+                 captured_at) = sample
+                # Time of the newest sample analysed (one frame of audio was just pumped)
+                sample_ms = now_ms if fast else captured_at * 1000
+                if pitch_filter is not None:
+                    pitch_filter.update(sample_ms - window_delay_ms, current_pitch,
+                                        current_confidence)
+                if recorded is not None:
+                    recorded.append((sample_ms, current_pitch, current_volume,
+                                     current_confidence))
+            if pitch_filter is not None:
+                pitch, confidence = pitch_filter.predict(now_ms + display_lead_ms)
+            else:
+                pitch, confidence = current_pitch, current_confidence
+            if profiler:
+                profiler.mark('audio')
+
+            # Move the bird, spawn and scroll obstacles, detect passes and collisions
+            step_start = time.perf_counter()
+            passed, hit = game.step(dt, pitch, current_volume, current_floor, confidence)
+            for _ in range(passed):
+                score += 1
+                print(f"🎉 Great! Score: {score} obstacles passed!")  # More encouraging message
+            if hit:
+                game_over = True
+                print(f"💀 Game Over! Final Score: {score}")
+            if profiler:
+                profiler.mark('sim')
+
+            # Draw game
+            # Sky and clouds (decoration)
+            background.draw(screen, pygame.time.get_ticks())
+
+            # Draw obstacles
+            draw_obstacles(screen, obstacles, layout.height)
+
+            # Draw bird
+            draw_bird(screen, bird)
+
+            # Draw UI
+            latency_ms = latency_meter.last * 1000 if latency_meter.count else None
+            ui.draw(screen, score, current_pitch, current_volume, game_over=False, paused=False,
+                    latency_ms=latency_ms, floor=current_floor)
+            if profiler:
+                draw_profile(screen)
+
+            pygame.display.flip()
+            if profiler:
+                profiler.mark('flip')
+
+            # The bird has now moved on screen in response to this audio
+            shown = time.perf_counter()
+            if captured_at is not None:
+                latency_meter.add(shown - captured_at)
+            if not fast:
+                display_lead_ms += 0.1 * ((shown - step_start) * 1000 - display_lead_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import math
+
+import numpy as np
+
+# Adaptive noise floor for the voice bird games.
+# The games' volume thresholds (80 to move the bird, 100 to run pitch detection,
+# 150 for the simple game) were tuned on a quiet microphone whose background level
+# is about REFERENCE_FLOOR. Instead of comparing against them directly, each
+# threshold is scaled by measured_floor / REFERENCE_FLOOR, so the same settings
+# work in a noisy arcade and on a hot microphone.
+#
+# The floor is measured in two steps: a calibration phase over the first
+# CALIBRATION_SECONDS of audio (the player is asked to stay quiet) takes the median
+# level, after which a moving low percentile keeps tracking it. The percentile is
+# updated incrementally once per chunk in decibels, so each step scales the floor
+# by a constant factor (an exponential moving percentile): it falls quickly when
+# the room gets quieter and rises only slowly while the player is singing.
+
+REFERENCE_FLOOR = 20.0      # RMS background level the fixed thresholds were tuned for
+MIN_FLOOR = 5.0             # Digital silence must not drive every threshold to zero
+CALIBRATION_SECONDS = 1.5
+PERCENTILE = 0.1            # Track the 10th percentile of the chunk levels
+RATE_DB_PER_SECOND = 5.0    # Falls at 4.5 dB/s, rises at 0.5 dB/s
+
+
+def relative_threshold(threshold, floor):
+    """Scale a threshold tuned for REFERENCE_FLOOR to the measured floor
+    (infinite while the floor is still being calibrated)"""
+    if not floor:
+        return math.inf
+    return threshold * floor / REFERENCE_FLOOR
+
+
+class NoiseFloor:
+    """Per-chunk noise floor estimate; floor is 0 until calibration has finished"""
+
+    def __init__(self, chunk_seconds, calibration_seconds=CALIBRATION_SECONDS,
+                 percentile=PERCENTILE, rate_db=RATE_DB_PER_SECOND, fixed=None):
+        self.percentile = percentile
+        self.step = rate_db * chunk_seconds
+        self.min_db = 20 * math.log10(MIN_FLOOR)
+        self.calibration = np.zeros(max(1, round(calibration_seconds / chunk_seconds)))
+        self.seen = 0
+        self.fixed = fixed is not None
+        self.level_db = None if fixed is None else 20 * math.log10(max(fixed, MIN_FLOOR))
+        self.floor = 0.0 if fixed is None else 10 ** (self.level_db / 20)
+
+    @property
+    def calibrating(self):
+        return self.level_db is None
+
+    def update(self, volume):
+        """Feed the RMS volume of one chunk"""
+        if self.fixed:
+            return
+        level = 20 * math.log10(max(volume, MIN_FLOOR))
+        if self.level_db is None:
+            self.calibration[self.seen] = level
+            self.seen += 1
+            if self.seen < len(self.calibration):
+                return
+            self.level_db = float(np.median(self.calibration))
+        elif level < self.level_db:
+            self.level_db = max(self.min_db, self.level_db - self.step * (1 - self.percentile))
+        else:
+            self.level_db += self.step * self.percentile
+        self.floor = 10 ** (self.level_db / 20)
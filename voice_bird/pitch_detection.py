@@ -0,0 +1,261 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+# Pluggable pitch detection for the voice bird games.
+# Every detector precomputes its windows, FFT sizes and frequency masks once,
+# works on a single chunk of samples and returns (pitch_hz, confidence).
+# Work arrays are allocated once as well and filled in place (out=), so only the
+# FFT results are new arrays per chunk.
+# A pitch of 0 means no pitch was found. Calling a detector also records how
+# long each chunk took so the per-chunk cost can be checked on the target device.
+
+DEFAULT_FMIN = 80    # Human voice range, same as the original analyze_audio
+DEFAULT_FMAX = 1000
+
+
+def parabolic_offset(y_left, y_center, y_right):
+    """Sub-bin offset of the extremum of a parabola through three points"""
+    denominator = y_left - 2 * y_center + y_right
+    if denominator == 0:
+        return 0.0
+    return 0.5 * (y_left - y_right) / denominator
+
+
+class PitchDetector:
+    """Base class: subclasses implement estimate(samples)"""
+
+    name = None
+
+    def __init__(self, rate, chunk, fmin=DEFAULT_FMIN, fmax=DEFAULT_FMAX):
+        self.rate = rate
+        self.chunk = chunk
+        self.fmin = fmin
+        self.fmax = fmax
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def estimate(self, samples):
+        raise NotImplementedError
+
+    def __call__(self, samples):
+        """Estimate pitch and record the cost of this chunk"""
+        start = time.perf_counter()
+        result = self.estimate(samples)
+        elapsed = time.perf_counter() - start
+        self.calls += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        return result
+
+    def stats(self):
+        """Per-chunk cost in microseconds"""
+        return {
+            'method': self.name,
+            'chunks': self.calls,
+            'mean_us': self.total_time / self.calls * 1e6 if self.calls else 0.0,
+            'max_us': self.max_time * 1e6,
+        }
+
+
+class FFTPeakDetector(PitchDetector):
+    """Strongest spectral peak in the voice band (the original approach),
+    using a real FFT, a Hann window and parabolic peak interpolation"""
+
+    name = 'fft'
+
+    def __init__(self, rate, chunk, fmin=DEFAULT_FMIN, fmax=DEFAULT_FMAX):
+        super().__init__(rate, chunk, fmin, fmax)
+        self.window = np.hanning(chunk)
+        freqs = np.fft.rfftfreq(chunk, 1 / rate)
+        band = np.flatnonzero((freqs > fmin) & (freqs < fmax))
+        self.lo, self.hi = band[0], band[-1] + 1
+        self.bin_hz = rate / chunk
+        self.windowed = np.zeros(chunk)
+        self.magnitude = np.zeros(chunk // 2 + 1)
+
+    def estimate(self, samples):
+        np.multiply(samples, self.window, out=self.windowed)
+        magnitude = np.abs(np.fft.rfft(self.windowed), out=self.magnitude)
+        band = magnitude[self.lo:self.hi]
+        peak = int(np.argmax(band))
+        total = band.sum()
+        if total <= 0:
+            return 0.0, 0.0
+        k = self.lo + peak
+        offset = 0.0
+        if 0 < k < len(magnitude) - 1:
+            offset = parabolic_offset(magnitude[k - 1], magnitude[k], magnitude[k + 1])
+        return (k + offset) * self.bin_hz, float(band[peak] / total)
+
+
+class HPSDetector(PitchDetector):
+    """Harmonic product spectrum: multiplies the spectrum with copies of itself
+    compressed by 2..harmonics, so the fundamental wins over its overtones"""
+
+    name = 'hps'
+
+    def __init__(self, rate, chunk, fmin=DEFAULT_FMIN, fmax=DEFAULT_FMAX,
+                 harmonics=3, zero_pad=4):
+        super().__init__(rate, chunk, fmin, fmax)
+        self.harmonics = harmonics
+        self.n_fft = chunk * zero_pad
+        self.window = np.hanning(chunk)
+        self.bin_hz = rate / self.n_fft
+        self.lo = int(np.ceil(fmin / self.bin_hz))
+        self.hi = int(fmax / self.bin_hz) + 1
+        # Largest bin that every compressed copy can still reach
+        self.n_bins = min(self.hi + 1, (self.n_fft // 2 + 1) // harmonics)
+        self.padded = np.zeros(self.n_fft)      # Zero padding written once
+        self.log_spectrum = np.zeros(self.n_fft // 2 + 1)
+        self.hps = np.zeros(self.n_bins)
+
+    def estimate(self, samples):
+        np.multiply(samples, self.window, out=self.padded[:self.chunk])
+        log_spectrum = np.abs(np.fft.rfft(self.padded), out=self.log_spectrum)
+        log_spectrum += 1e-12
+        np.log(log_spectrum, out=log_spectrum)
+        hps = self.hps
+        hps[:] = log_spectrum[:self.n_bins]
+        for h in range(2, self.harmonics + 1):
+            hps += log_spectrum[:self.n_bins * h:h]
+        band = hps[self.lo:self.hi]
+        if len(band) == 0:
+            return 0.0, 0.0
+        peak = int(np.argmax(band))
+        k = self.lo + peak
+        offset = 0.0
+        if 0 < k < len(hps) - 1:
+            offset = parabolic_offset(hps[k - 1], hps[k], hps[k + 1])
+        # Confidence: how far the winning bin stands above the band average
+        spread = band.max() - band.mean()
+        confidence = float(1 - np.exp(-spread / self.harmonics)) if spread > 0 else 0.0
+        return (k + offset) * self.bin_hz, confidence
+
+
+class YINDetector(PitchDetector):
+    """YIN: cumulative mean normalized difference function, computed with an
+    FFT autocorrelation, first dip below the threshold, parabolic refinement"""
+
+    name = 'yin'
+
+    def __init__(self, rate, chunk, fmin=DEFAULT_FMIN, fmax=DEFAULT_FMAX, threshold=0.15):
+        super().__init__(rate, chunk, fmin, fmax)
+        self.threshold = threshold
+        self.tau_min = max(2, int(rate / fmax))
+        self.tau_max = min(int(np.ceil(rate / fmin)), chunk // 2 + chunk // 4)
+        self.window = chunk - self.tau_max   # integration window length
+        self.n_fft = 1 << int(np.ceil(np.log2(chunk + self.window)))
+        self.taus = np.arange(1, self.tau_max + 1)
+        # float64: the running sum of squared int16 samples overflows float32 precision
+        self.padded = np.zeros(self.n_fft)          # Chunk, zero padded
+        self.padded_window = np.zeros(self.n_fft)   # First integration window, zero padded
+        self.energy = np.zeros(chunk + 1)
+        self.diff = np.zeros(self.tau_max + 1)
+        self.scratch = np.zeros(self.tau_max)
+        self.cumulative = np.zeros(self.tau_max)
+        self.cmnd = np.ones(self.tau_max + 1)
+
+    def estimate(self, samples):
+        w = self.window
+        tau_max = self.tau_max
+        x = self.padded[:self.chunk]
+        x[:] = samples
+        self.padded_window[:w] = x[:w]
+        # Autocorrelation r(tau) = sum x[j] * x[j + tau] over the window
+        spectrum = np.fft.rfft(self.padded)
+        window_spectrum = np.fft.rfft(self.padded_window)
+        spectrum *= np.conj(window_spectrum, out=window_spectrum)
+        corr = np.fft.irfft(spectrum, self.n_fft)[:tau_max + 1]
+        # Energy of each shifted window from a running sum of squares
+        energy = self.energy
+        np.multiply(x, x, out=energy[1:])
+        np.cumsum(energy[1:], out=energy[1:])
+        diff = self.diff
+        np.subtract(energy[w:w + tau_max + 1], energy[:tau_max + 1], out=diff)
+        diff += energy[w]
+        corr *= 2
+        diff -= corr
+
+        # Cumulative mean normalized difference
+        cumulative = np.cumsum(diff[1:], out=self.cumulative)
+        cmnd = self.cmnd
+        cmnd[1:] = 1
+        np.multiply(diff[1:], self.taus, out=self.scratch)
+        np.divide(self.scratch, cumulative, out=cmnd[1:], where=cumulative > 0)
+
+        search = cmnd[self.tau_min:tau_max]
+        below = np.flatnonzero(search < self.threshold)
+        if len(below):
+            tau = self.tau_min + below[0]
+            # Walk down to the bottom of this dip
+            while tau + 1 < tau_max and cmnd[tau + 1] < cmnd[tau]:
+                tau += 1
+        else:
+            tau = self.tau_min + int(np.argmin(search))
+        value = cmnd[tau]
+        if value >= 1:
+            return 0.0, 0.0
+        offset = 0.0
+        if 0 < tau < tau_max:
+            offset = parabolic_offset(cmnd[tau - 1], cmnd[tau], cmnd[tau + 1])
+        return self.rate / (tau + offset), float(max(0.0, 1 - value))
+
+
+DETECTORS = {cls.name: cls for cls in (FFTPeakDetector, HPSDetector, YINDetector)}
+
+
+def create_detector(method, rate, chunk, **kwargs):
+    """Build a detector by name: 'fft', 'hps' or 'yin'"""
+    return DETECTORS[method](rate, chunk, **kwargs)
+
+
+def synthetic_voice(f0, rate, chunk, rng, harmonics=8, noise=0.05):
+    """A harmonic-rich, speech-like test chunk with a weak fundamental"""
+    t = np.arange(chunk) / rate
+    signal = np.zeros(chunk)
+    for h in range(1, harmonics + 1):
+        if f0 * h >= rate / 2:
+            break
+        # Second and third harmonics louder than the fundamental, as in many voices
+        amplitude = (0.6 if h == 1 else 1.0) / h ** 0.7
+        signal += amplitude * np.sin(2 * np.pi * f0 * h * t + rng.uniform(0, 2 * np.pi))
+    signal += noise * rng.standard_normal(chunk)
+    return 3000 * signal / np.max(np.abs(signal))
+
+
+def benchmark(rate=44100, chunk=1024, trials=400, seed=0):
+    """Accuracy (cents, octave errors) and per-chunk cost of every backend"""
+    rng = np.random.default_rng(seed)
+    truths = rng.uniform(90, 800, trials)
+    chunks = [synthetic_voice(f0, rate, chunk, rng) for f0 in truths]
+    results = []
+    for method in DETECTORS:
+        detector = create_detector(method, rate, chunk)
+        estimates = np.array([detector(samples)[0] for samples in chunks])
+        found = estimates > 0
+        cents = np.abs(1200 * np.log2(estimates[found] / truths[found]))
+        stats = detector.stats()
+        stats.update({
+            'median_error_cents': float(np.median(cents)) if len(cents) else None,
+            'octave_error_rate': float(np.mean(cents > 600)) if len(cents) else None,
+            'missed_rate': float(1 - np.mean(found)),
+        })
+        results.append(stats)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pitch detector accuracy and cost benchmark")
+    parser.add_argument("--rate", type=int, default=44100)
+    parser.add_argument("--chunk", type=int, default=1024)
+    parser.add_argument("--trials", type=int, default=400)
+    args = parser.parse_args()
+    print(json.dumps(benchmark(args.rate, args.chunk, args.trials), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+import argparse
+import json
+import math
+
+import numpy as np
+
+from .controls import FRAME_MS, PitchControl, pitch_to_y
+from .noise_floor import REFERENCE_FLOOR
+from .sim import Bird, PitchTrace
+
+# Pitch filtering and prediction between the audio channel and the bird.
+# A pitch reaches the bird late: the analysis window is centred half a window
+# before its newest sample, the result waits for the next frame, and the frame is
+# shown after rendering and flipping. Raw per-window pitches are also noisy, so
+# the bird was both jumpy and behind the voice. A filter here is fed each new
+# pitch stamped with the time it describes (the window centre) and is asked, once
+# per frame, for the pitch expected at the time the frame will be on screen; the
+# difference is the measured pipeline latency, extrapolated with the filter's
+# pitch velocity (at most MAX_LEAD_MS).
+#
+#   'none'      the newest raw pitch, as before
+#   'one-euro'  one-euro filter (Casiez et al.): a low-pass whose cutoff rises with
+#               the speed of the pitch, so it is smooth when holding a note and
+#               quick on glides; the filtered derivative gives the prediction
+#   'kalman'    constant-velocity Kalman filter; the measurement noise grows as the
+#               pitch confidence falls, so doubtful windows count for less
+#
+# Both filters work in octaves (log2 Hz), where singing errors and vibrato have the
+# same size at every pitch. A jump of more than JUMP_OCTAVES that the next window
+# confirms (a new note) or a pause of more than GAP_MS (a new phrase) restarts them
+# at the new pitch instead of gliding there; an unconfirmed jump (an octave error of
+# the detector) is dropped. An unvoiced window ends the note until the next pitch.
+#
+# `python -m voice_bird.pitch_filter` measures the control error each filter
+# leaves: a PitchTrace is played through the analysis latency, the filter and
+# PitchControl at 60 FPS, and the bird's height is compared with the height of the
+# pitch actually sung when each frame is shown (known for the generated melody,
+# a centred offline smoothing of the trace for recorded ones).
+
+GAP_MS = 150            # Unvoiced for longer than this: the next pitch starts afresh
+MAX_LEAD_MS = 100       # Never extrapolate further than this
+JUMP_OCTAVES = 0.25     # Three semitones: a new note, not a glide
+HOP = 768               # Samples between analysed windows in the game (game.frame_hop)
+
+
+class PitchFilter:
+    """Base class: subclasses keep state in octaves and implement start(t, x),
+    correct(t, x, confidence) and extrapolate(lead_ms)"""
+
+    name = None
+
+    def __init__(self):
+        self.last_time = None   # ms, time of the newest voiced pitch
+        self.voiced = False
+        self.confidence = 0.0
+        self.pending = None     # Octaves of an unconfirmed jump
+
+    def update(self, t, pitch, confidence=1.0):
+        """Feed the pitch (0: none) that a window centred at time t (ms) measured"""
+        if pitch <= 0:
+            self.voiced = False
+            return
+        x = math.log2(pitch)
+        if self.last_time is None or t - self.last_time > GAP_MS:
+            self.start(t, x)
+        elif abs(x - self.extrapolate(t - self.last_time)) > JUMP_OCTAVES:
+            # A new note, or a single octave error: only follow a jump that the
+            # next window confirms
+            pending, self.pending = self.pending, x
+            if pending is None or abs(x - pending) > JUMP_OCTAVES:
+                return
+            self.start(t, x)
+        else:
+            self.correct(t, x, confidence)
+        self.pending = None
+        self.last_time = t
+        self.voiced = True
+        self.confidence = confidence
+
+    def predict(self, t):
+        """(pitch, confidence) expected at time t (ms); (0, 0) between notes"""
+        if not self.voiced:
+            return 0, 0.0
+        lead = max(0.0, min(t - self.last_time, MAX_LEAD_MS))
+        return 2 ** self.extrapolate(lead), self.confidence
+
+
+class RawPitch(PitchFilter):
+    """No filtering: the newest pitch as it came"""
+
+    name = 'none'
+
+    def update(self, t, pitch, confidence=1.0):
+        self.pitch = pitch
+        self.voiced = pitch > 0
+        self.confidence = confidence
+
+    def predict(self, t):
+        return (self.pitch, self.confidence) if self.voiced else (0, 0.0)
+
+
+def smoothing_factor(dt_ms, cutoff_hz):
+    """Exponential smoothing factor of a first-order low-pass for a dt_ms step"""
+    tau_ms = 1000 / (2 * math.pi * cutoff_hz)
+    return 1 / (1 + tau_ms / dt_ms)
+
+
+class OneEuroFilter(PitchFilter):
+    """Adaptive low-pass: cutoff = min_cutoff + beta * |speed in octaves/s|"""
+
+    name = 'one-euro'
+
+    def __init__(self, min_cutoff=4.0, beta=10.0, d_cutoff=4.0):
+        super().__init__()
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+
+    def start(self, t, x):
+        self.x = x
+        self.dx = 0.0   # Octaves per ms
+
+    def correct(self, t, x, confidence):
+        dt = t - self.last_time
+        if dt <= 0:
+            return
+        a_d = smoothing_factor(dt, self.d_cutoff)
+        self.dx += a_d * ((x - self.x) / dt - self.dx)
+        cutoff = self.min_cutoff + self.beta * abs(self.dx) * 1000
+        self.x += smoothing_factor(dt, cutoff) * (x - self.x)
+
+    def extrapolate(self, lead_ms):
+        return self.x + self.dx * lead_ms
+
+
+class KalmanPitchFilter(PitchFilter):
+    """Constant-velocity Kalman filter; state (octaves, octaves per ms)"""
+
+    name = 'kalman'
+
+    def __init__(self, noise_cents=20.0, acceleration=40.0):
+        super().__init__()
+        # Measurement noise at full confidence, and the white-noise pitch
+        # acceleration (octaves/s^2) that lets the state follow glides and vibrato
+        self.r = (noise_cents / 1200) ** 2
+        self.q = (acceleration / 1e6) ** 2
+
+    def start(self, t, x):
+        self.state = np.array([x, 0.0])
+        self.cov = np.diag([self.r, (4 / 1000) ** 2])  # Speed unknown: up to 4 octaves/s
+
+    def correct(self, t, x, confidence):
+        dt = t - self.last_time
+        if dt <= 0:
+            return
+        # Predict to t
+        transition = np.array([[1.0, dt], [0.0, 1.0]])
+        noise = self.q * np.array([[dt ** 4 / 4, dt ** 3 / 2], [dt ** 3 / 2, dt ** 2]])
+        state = transition @ self.state
+        cov = transition @ self.cov @ transition.T + noise
+        # Update with the measured pitch
+        r = self.r / max(confidence, 0.05)
+        gain = cov[:, 0] / (cov[0, 0] + r)
+        state += gain * (x - state[0])
+        cov -= np.outer(gain, cov[0])
+        self.state = state
+        self.cov = cov
+
+    def extrapolate(self, lead_ms):
+        return self.state[0] + self.state[1] * lead_ms
+
+
+FILTERS = {cls.name: cls for cls in (RawPitch, OneEuroFilter, KalmanPitchFilter)}
+
+
+def create_filter(name, **kwargs):
+    """Build a pitch filter by name: 'none', 'one-euro' or 'kalman'"""
+    return FILTERS[name](**kwargs)
+
+
+def sung_melody(seconds=60.0, hop_ms=HOP / 44.1, window_ms=1024 / 44.1, seed=0,
+                noise_cents=15.0, outliers=0.02, dropouts=0.03):
+    """A generated singer: notes with vibrato, glides and rests, measured every hop
+    with pitch noise, octave errors and dropouts. Returns (trace, truth), truth(t)
+    being the pitch sung at time t (ms; 0 while resting)"""
+    rng = np.random.default_rng(seed)
+    # Note list: (start_ms, end_ms, start_hz, end_hz), a glide when they differ
+    notes = []
+    t = 300.0
+    pitch = rng.uniform(150, 400)
+    while t < seconds * 1000:
+        length = rng.uniform(250, 900)
+        target = float(np.clip(pitch * 2 ** (rng.integers(-7, 8) / 12), 110, 650))
+        glide = rng.uniform(60, 200) if rng.random() < 0.4 else 0.0
+        if glide:
+            notes.append((t, t + glide, pitch, target))
+        notes.append((t + glide, t + glide + length, target, target))
+        pitch = target
+        t += glide + length
+        if rng.random() < 0.25:
+            t += rng.uniform(150, 500)  # Rest, then start the next phrase
+    starts = np.array([note[0] for note in notes])
+    vibrato_rate = rng.uniform(4.5, 6.5)
+
+    def truth(time_ms):
+        i = np.searchsorted(starts, time_ms, side='right') - 1
+        if i < 0 or time_ms >= notes[i][1]:
+            return 0.0
+        start, end, f0, f1 = notes[i]
+        base = f0 * (f1 / f0) ** ((time_ms - start) / (end - start))
+        depth = 0.3 * min(1.0, (time_ms - start) / 300)     # Vibrato fades in, 30 cents
+        return base * 2 ** (depth * math.sin(2 * math.pi * vibrato_rate * time_ms / 1000) / 12)
+
+    times = np.arange(hop_ms, seconds * 1000, hop_ms)
+    pitches = np.zeros(len(times))
+    confidences = np.zeros(len(times))
+    volumes = np.zeros(len(times))
+    for i, end in enumerate(times):
+        sung = truth(end - window_ms / 2)   # The window describes its centre
+        if sung <= 0 or rng.random() < dropouts:
+            continue
+        volumes[i] = 1000.0
+        if rng.random() < outliers:
+            pitches[i] = sung * rng.choice([0.5, 2.0])
+            confidences[i] = rng.uniform(0.1, 0.6)
+        else:
+            pitches[i] = sung * 2 ** (rng.normal(0, noise_cents) / 1200)
+            confidences[i] = rng.uniform(0.6, 1.0)
+    return PitchTrace(times, pitches, volumes, confidences), truth
+
+
+def offline_reference(trace, window_ms):
+    """Best guess of the sung pitch for a recorded trace: a centred (non-causal)
+    median of 5 and mean of 7 windows in octaves, placed at the window centres;
+    returns truth(t) like sung_melody"""
+    x = np.where(trace.pitches > 0, np.log2(np.maximum(trace.pitches, 1e-9)), np.nan)
+    padded = np.pad(x, 3, constant_values=np.nan)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 7)
+    median = np.median(windows[:, 1:6], axis=1)
+    median_padded = np.pad(median, 3, constant_values=np.nan)
+    smooth = np.mean(np.lib.stride_tricks.sliding_window_view(median_padded, 7), axis=1)
+    reference = np.where(np.isnan(smooth) | np.isnan(x), 0.0, 2 ** np.nan_to_num(smooth))
+    centres = trace.times - window_ms / 2
+
+    def truth(time_ms):
+        i = np.searchsorted(centres, time_ms, side='right') - 1
+        return float(reference[i]) if 0 <= i < len(reference) else 0.0
+
+    return truth
+
+
+def control_error(trace, truth, pitch_filter, latency_ms=10.0, window_ms=1024 / 44.1,
+                  display_ms=FRAME_MS / 2, settle_ms=100.0):
+    """Play a trace through the pipeline at 60 FPS. A pitch becomes visible to the
+    game latency_ms after its newest sample, the frame appears display_ms after the
+    game step. Returns the error in pixels between the bird and the sung pitch for
+    frames where a note has been sung for settle_ms, and the jitter: RMS frame to
+    frame change of that error while a note is held (sung within a semitone for
+    settle_ms)"""
+    control = PitchControl()
+    layout = control.layout
+    bird = Bird(layout.bird_x, layout.height // 2, layout.bird_size)
+    newest = -1
+    errors = []
+    changes = []
+    voiced_for = held_for = 0.0
+    previous_sung = previous_error = None
+    frames = int((trace.duration - latency_ms) / FRAME_MS)
+    for frame in range(frames):
+        now = frame * FRAME_MS
+        index = int(np.searchsorted(trace.times, now - latency_ms, side='right')) - 1
+        if index > newest:
+            newest = index
+            pitch_filter.update(trace.times[index] - window_ms / 2, trace.pitches[index],
+                                trace.confidences[index])
+        shown = now + display_ms
+        pitch, confidence = pitch_filter.predict(shown)
+        volume = trace.volumes[newest] if newest >= 0 else 0.0
+        control.move(bird, pitch, volume, REFERENCE_FLOOR, FRAME_MS, confidence)
+        bird.y = max(bird.size, min(layout.height - bird.size, bird.y))
+
+        sung = truth(shown)
+        if sung <= 0:
+            voiced_for = held_for = 0.0
+            previous_sung = previous_error = None
+            continue
+        voiced_for += FRAME_MS
+        if previous_sung and abs(math.log2(sung / previous_sung)) < 1 / 12:
+            held_for += FRAME_MS
+        else:
+            previous_sung = sung
+            held_for = 0.0
+        error = bird.y - pitch_to_y(sung, layout.height)
+        if voiced_for > settle_ms:
+            errors.append(abs(error))
+        if held_for > settle_ms and previous_error is not None:
+            changes.append(error - previous_error)
+        previous_error = error
+    errors = np.array(errors)
+    return {
+        'frames': len(errors),
+        'mean_error_px': float(errors.mean()) if len(errors) else None,
+        'p95_error_px': float(np.percentile(errors, 95)) if len(errors) else None,
+        'jitter_px': float(np.sqrt(np.mean(np.square(changes)))) if changes else None,
+    }
+
+
+def benchmark(inputs, latency_ms=10.0, window_ms=1024 / 44.1):
+    """Control error of every filter on each (name, trace, truth) input"""
+    results = []
+    for name, trace, truth in inputs:
+        for method in FILTERS:
+            result = control_error(trace, truth, create_filter(method), latency_ms, window_ms)
+            results.append(dict({'input': name, 'filter': method}, **result))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Control error of the pitch filters")
+    parser.add_argument("--trace", action='append', default=[],
+                        help="recorded PitchTrace CSV (time_ms,pitch,volume[,confidence]), "
+                             "may be repeated")
+    parser.add_argument("--trace-from", action='append', default=[],
+                        help="analyse a WAV file or generated signal into a trace first")
+    parser.add_argument("--seconds", type=float, default=60.0,
+                        help="length of the generated melody (used when no trace is given)")
+    parser.add_argument("--latency", type=float, default=10.0,
+                        help="ms from a window's newest sample to the game reading it")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    window_ms = 1024 / 44.1
+    inputs = []
+    for path in args.trace:
+        trace = PitchTrace.load(path)
+        inputs.append((path, trace, offline_reference(trace, window_ms)))
+    for spec in args.trace_from:
+        trace = PitchTrace.from_audio(spec, hop=HOP, seed=args.seed)
+        inputs.append((spec, trace, offline_reference(trace, window_ms)))
+    if not inputs:
+        trace, truth = sung_melody(args.seconds, seed=args.seed)
+        inputs.append(('melody', trace, truth))
+    print(json.dumps(benchmark(inputs, args.latency, window_ms), indent=2))
+
+
+if __name__ == "__main__":
+    main()
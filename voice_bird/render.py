@@ -0,0 +1,243 @@
+import pygame
+
+from .controls import PITCH_HIGH, PITCH_LOW
+from .noise_floor import relative_threshold
+
+# Drawing for every game variant: sky and cloud layers, pipes, the bird and the
+# user interface. Everything that does not change from frame to frame (cloud
+# strips, fonts, instructions, overlays) is rendered once; value texts are cached
+# until their string changes. The sizes come from the control scheme's Layout and
+# the UI panel shows what matters for its control: pitch or the fly threshold.
+
+# Color definitions
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+BLUE = (135, 206, 235)  # Sky blue
+GREEN = (34, 139, 34)   # Forest green
+RED = (255, 0, 0)       # Red
+YELLOW = (255, 255, 0)  # Yellow
+ORANGE = (255, 165, 0)  # Orange
+
+
+def draw_bird(screen, bird):
+    """Draw the bird"""
+    # Bird body
+    pygame.draw.circle(screen, YELLOW, (int(bird.x), int(bird.y)), bird.size)
+    # Bird beak
+    beak_points = [
+        (bird.x + bird.size, bird.y),
+        (bird.x + bird.size + 15, bird.y - 5),
+        (bird.x + bird.size + 15, bird.y + 5)
+    ]
+    pygame.draw.polygon(screen, ORANGE, beak_points)
+    # Bird eye
+    pygame.draw.circle(screen, BLACK, (int(bird.x + 8), int(bird.y - 5)), 3)
+
+
+def draw_obstacles(screen, obstacles, height):
+    """Draw obstacles (pipes) of an ObstacleField"""
+    for obstacle in obstacles.active:
+        x = obstacle.x - obstacles.scroll
+        top = obstacle.gap_y - obstacle.gap_size//2
+        bottom = obstacle.gap_y + obstacle.gap_size//2
+        # Upper pipe
+        pygame.draw.rect(screen, GREEN, (x, 0, obstacle.width, top))
+        # Lower pipe
+        pygame.draw.rect(screen, GREEN, (x, bottom, obstacle.width, height - bottom))
+
+        # Pipe edges
+        pygame.draw.rect(screen, BLACK, (x, 0, obstacle.width, top), 3)
+        pygame.draw.rect(screen, BLACK, (x, bottom, obstacle.width, height - bottom), 3)
+
+
+def draw_cloud(surface, color, x, y, scale=1.0):
+    """Three overlapping circles"""
+    pygame.draw.circle(surface, color, (int(x), y), int(25 * scale))
+    pygame.draw.circle(surface, color, (int(x + 20 * scale), y), int(30 * scale))
+    pygame.draw.circle(surface, color, (int(x + 40 * scale), y), int(25 * scale))
+
+
+class ParallaxLayer:
+    """A horizontally repeating band of clouds, pre-rendered once into a strip one
+    period plus one screen wide, so scrolling it costs a single blit"""
+
+    def __init__(self, clouds, period, speed, width, color=WHITE, scale=1.0):
+        # clouds: [(x, y), ...] within one period; speed in pixels per millisecond
+        margin = int(30 * scale)
+        self.top = min(y for _, y in clouds) - margin
+        self.height = max(y for _, y in clouds) + margin - self.top
+        self.period = period
+        self.speed = speed
+        self.width = width
+        self.strip = pygame.Surface((period + width, self.height))
+        self.strip.fill(BLUE)
+        for repeat in range(-1, width // period + 2):
+            for x, y in clouds:
+                draw_cloud(self.strip, color, x + repeat * period, y - self.top, scale)
+        self.strip.set_colorkey(BLUE, pygame.RLEACCEL)
+        self.strip = self.strip.convert()
+
+    def draw(self, screen, ticks):
+        # Clouds drift right: show the part of the strip that is offset pixels to the left
+        offset = int(ticks * self.speed) % self.period
+        screen.blit(self.strip, (0, self.top),
+                    (self.period - offset, 0, self.width, self.height))
+
+
+class Background:
+    """Sky and cloud layers, farthest first"""
+
+    def __init__(self, width, parallax=False):
+        self.layers = []
+        if parallax:
+            # Smaller, paler and slower clouds further away
+            self.layers.append(ParallaxLayer([(i * 230, 35 + (i % 3) * 22) for i in range(7)],
+                                             period=width + 410, speed=0.008, width=width,
+                                             color=(220, 235, 245), scale=0.6))
+        self.layers.append(ParallaxLayer([(i * 300, 50 + i * 30) for i in range(5)],
+                                         period=width + 100, speed=0.02, width=width))
+
+    def draw(self, screen, ticks):
+        screen.fill(BLUE)  # Sky background
+        for layer in self.layers:
+            layer.draw(screen, ticks)
+
+
+INSTRUCTIONS = {
+    'pitch': [
+        "🎤 Voice Controls:",
+        "• High pitch = Fly high",
+        "• Low pitch = Fly low",
+        "• No sound = Stay still",
+        "• Press SPACE to pause",
+        "• Avoid green obstacles!"
+    ],
+    'volume': [
+        "🎤 Voice Controls:",
+        "• Make a sound = Fly up",
+        "• Stay quiet = Fall down",
+        "• Press SPACE to pause",
+        "• Avoid green obstacles!"
+    ],
+}
+
+
+class GameUI:
+    """User interface: fonts, static texts and overlays are created once, and value
+    texts (score, pitch, volume, ...) are only re-rendered when they change"""
+
+    def __init__(self, control):
+        self.control = control
+        width, height = control.layout.width, control.layout.height
+        self.font = pygame.font.Font(None, 48)  # Increase font size
+        self.small_font = pygame.font.Font(None, 28)
+        self.medium_font = pygame.font.Font(None, 36)
+        self.texts = {}  # slot -> (string, surface)
+
+        self.pitch_label = self.small_font.render("Pitch Level", True, BLACK)
+
+        # Control instructions
+        self.play_instructions = self.render_lines(INSTRUCTIONS[control.name])
+        self.pause_instructions = self.render_lines([
+            "⏸️ GAME PAUSED",
+            "• Press SPACE to continue",
+            "• Press ESC to quit"
+        ])
+
+        # Pause state overlay
+        self.pause_overlay = pygame.Surface((width, height))
+        self.pause_overlay.set_alpha(64)  # Slight transparency
+        self.pause_overlay.fill(BLACK)
+        big_font = pygame.font.Font(None, 96)
+        self.pause_texts = [
+            (big_font.render("⏸️ PAUSED", True, WHITE), (width//2 - 150, height//2 - 50)),
+            (self.font.render("Press SPACE to continue", True, WHITE),
+             (width//2 - 150, height//2 + 20)),
+        ]
+
+        # Game over interface - larger and more prominent
+        self.game_over_overlay = pygame.Surface((width, height))
+        self.game_over_overlay.set_alpha(128)  # Semi-transparent
+        self.game_over_overlay.fill(BLACK)
+        big_font = pygame.font.Font(None, 72)
+        self.game_over_texts = [
+            (big_font.render("💀 GAME OVER!", True, RED), (width//2 - 180, height//2 - 100)),
+            (self.medium_font.render("⌨️ Press SPACE to restart", True, WHITE),
+             (width//2 - 120, height//2 + 20)),
+            (self.small_font.render("Press ESC to quit", True, WHITE),
+             (width//2 - 60, height//2 + 60)),
+        ]
+        self.final_score_position = (width//2 - 200, height//2 - 40)
+
+    def render_lines(self, lines):
+        """Pre-render instruction lines as (surface, position) pairs for screen.blits"""
+        return [(self.small_font.render(line, True, BLACK), (10, 190 + i * 28))
+                for i, line in enumerate(lines)]
+
+    def text(self, slot, font, string, color):
+        """Surface for a value text, re-rendered only when its string changes"""
+        cached = self.texts.get(slot)
+        if cached is None or cached[0] != string:
+            cached = (string, font.render(string, True, color))
+            self.texts[slot] = cached
+        return cached[1]
+
+    def draw(self, screen, score, pitch, volume, game_over=False, paused=False, latency_ms=None,
+             floor=None):
+        """Draw user interface"""
+        # Score - more prominent display
+        screen.blit(self.text('score', self.font, f"🏆 Score: {score}", BLACK), (10, 10))
+
+        # Audio information
+        small_font = self.small_font
+        if self.control.uses_pitch:
+            screen.blit(self.text('pitch', small_font, f"Pitch: {pitch:.1f} Hz", BLACK), (10, 70))
+        elif floor:
+            status = ("🔊 FLYING UP!" if self.control.flying(volume, floor)
+                      else "🔇 falling down...")
+            screen.blit(self.text('status', small_font, status, BLACK), (10, 70))
+        screen.blit(self.text('volume', small_font, f"Volume: {volume:.1f}", BLACK), (10, 95))
+        if latency_ms is not None:
+            screen.blit(self.text('latency', small_font, f"Latency: {latency_ms:.0f} ms", BLACK),
+                        (220, 70))
+        if floor is not None:
+            floor_label = f"Noise floor: {floor:.0f}" if floor else "🤫 Calibrating... stay quiet"
+            screen.blit(self.text('floor', small_font, floor_label, BLACK), (220, 95))
+
+        # Volume bar
+        bar_width = 200
+        bar_height = 12
+        volume_ratio = min(1.0, volume / 1000)
+        pygame.draw.rect(screen, BLACK, (10, 120, bar_width, bar_height), 2)
+        pygame.draw.rect(screen, GREEN, (10, 120, int(bar_width * volume_ratio), bar_height))
+
+        # Pitch indicator
+        if self.control.uses_pitch:
+            pitch_indicator_y = 140
+            if pitch > 0:
+                normalized_pitch = max(0, min(1, (pitch - PITCH_LOW) / (PITCH_HIGH - PITCH_LOW)))
+                indicator_x = 10 + int(bar_width * normalized_pitch)
+                pygame.draw.circle(screen, RED, (indicator_x, pitch_indicator_y + 15), 6)
+
+            pygame.draw.rect(screen, BLACK, (10, pitch_indicator_y, bar_width, 30), 2)
+            screen.blit(self.pitch_label, (10, pitch_indicator_y - 25))
+        elif floor:
+            # Fly threshold on the volume bar
+            threshold_x = 10 + int(bar_width * min(1.0, relative_threshold(
+                self.control.FLY_THRESHOLD, floor) / 1000))
+            pygame.draw.line(screen, RED, (threshold_x, 116), (threshold_x, 135), 2)
+
+        # Control instructions
+        screen.blits(self.pause_instructions if paused else self.play_instructions)
+
+        if paused:
+            screen.blit(self.pause_overlay, (0, 0))
+            screen.blits(self.pause_texts)
+
+        if game_over:
+            screen.blit(self.game_over_overlay, (0, 0))
+            final_score_text = self.text('final_score', self.medium_font,
+                                         f"🏆 Final Score: {score} obstacles passed!", WHITE)
+            screen.blits(self.game_over_texts[:1] +
+                         [(final_score_text, self.final_score_position)] +
+                         self.game_over_texts[1:])
@@ -0,0 +1,534 @@
+import argparse
+import csv
+import itertools
+import json
+import math
+import random
+import time
+from collections import deque
+
+import numpy as np
+
+from .controls import FRAME_MS, PITCH_HIGH, PITCH_LOW, Difficulty, PitchControl, y_to_pitch
+from .noise_floor import REFERENCE_FLOOR, relative_threshold
+
+# Headless simulation of the voice bird game.
+# BirdGame is the game logic behind both game variants (game.py only adds audio
+# and drawing): a seeded RNG for the obstacles, a control scheme from controls.py
+# moving the bird, and physics driven by the elapsed time dt in milliseconds.
+#
+# BatchBirdSim runs many games of the pitch-controlled variant at once with NumPy,
+# in the spirit of tetris_batch.BatchTetris, driven either by a scripted pitch trace
+# or by a bot that aims for the next gap with human-like noise and reaction time.
+# The CLI sweeps difficulty settings and reports score statistics as JSON:
+#
+#   python -m voice_bird.sim --games 4096 --gap-size 300,340,380 --speed 2.8,3.4
+#
+# The batch rules must stay those of BirdGame: `--check SEEDS` plays BirdGame and a
+# one-game BatchBirdSim side by side with the same gaps and inputs and reports the
+# first step where bird height, passes or collisions differ.
+
+
+class Bird:
+    def __init__(self, x, y, size):
+        self.x = x
+        self.y = y
+        self.size = size
+        self.target_y = y
+
+
+class Obstacle:
+    """Obstacle (pipes); x is in world coordinates, see ObstacleField"""
+    __slots__ = ('x', 'gap_y', 'gap_size', 'width', 'passed')
+
+    def reset(self, x, gap_y, gap_size, width):
+        """(Re)initialize a pooled obstacle at world position x"""
+        self.x = x
+        self.gap_y = gap_y
+        self.gap_size = gap_size
+        self.width = width
+        self.passed = False
+
+    def collides_with_bird(self, bird, scroll):
+        """Detect collision with bird"""
+        x = self.x - scroll
+        if (bird.x + bird.size > x and bird.x - bird.size < x + self.width):
+            if (bird.y - bird.size < self.gap_y - self.gap_size//2 or
+                bird.y + bird.size > self.gap_y + self.gap_size//2):
+                return True
+        return False
+
+
+class ObstacleField:
+    """All obstacles scroll at the same speed, so they keep world coordinates and a
+    single scroll offset moves them all. Active obstacles sit in a deque ordered by x;
+    off-screen ones go back to a pool and are reused instead of allocating new ones.
+    first is the index of the first active obstacle the bird can still touch."""
+
+    def __init__(self, speed, width):
+        self.speed = speed
+        self.width = width      # Of every obstacle
+        self.scroll = 0.0
+        self.active = deque()
+        self.pool = []
+        self.first = 0
+
+    def clear(self):
+        """Recycle every obstacle for a new game"""
+        self.pool.extend(self.active)
+        self.active.clear()
+        self.scroll = 0.0
+        self.first = 0
+
+    def spawn(self, screen_x, gap_y, gap_size):
+        obstacle = self.pool.pop() if self.pool else Obstacle()
+        obstacle.reset(screen_x + self.scroll, gap_y, gap_size, self.width)
+        self.active.append(obstacle)
+
+    def update(self, dt=FRAME_MS):
+        """Scroll and recycle obstacles that left the screen"""
+        self.scroll += self.speed * dt / FRAME_MS
+        active = self.active
+        while active and active[0].x + active[0].width < self.scroll:
+            self.pool.append(active.popleft())
+            if self.first:
+                self.first -= 1
+
+    def check(self, bird):
+        """Returns (obstacles newly passed, collision); only obstacles overlapping the
+        bird's span are visited, so the cost does not grow with the number spawned"""
+        passed = 0
+        hit = False
+        active = self.active
+        count = len(active)
+        # Obstacles already passed and wholly left of the bird can never touch it again
+        behind = bird.x - bird.size + self.scroll
+        first = self.first
+        while (first < count and active[first].passed
+               and active[first].x + active[first].width <= behind):
+            first += 1
+        self.first = first
+        right = bird.x + bird.size + self.scroll
+        for index in range(first, count):
+            obstacle = active[index]
+            if obstacle.x > right:
+                break
+            if obstacle.collides_with_bird(bird, self.scroll):
+                hit = True
+            if not obstacle.passed and obstacle.x + obstacle.width - self.scroll < bird.x:
+                obstacle.passed = True
+                passed += 1
+        return passed, hit
+
+
+class BirdGame:
+    """One game: bird, obstacles, score. rng is a random.Random (or a seed), control a
+    control scheme (default: pitch) whose Layout and Difficulty are used unless given"""
+
+    def __init__(self, rng=None, difficulty=None, control=None):
+        self.rng = rng if isinstance(rng, random.Random) else random.Random(rng)
+        self.control = control or PitchControl()
+        self.layout = self.control.layout
+        self.difficulty = difficulty or self.control.difficulty()
+        self.bird = Bird(self.layout.bird_x, self.layout.height // 2, self.layout.bird_size)
+        self.obstacles = ObstacleField(self.difficulty.speed, self.layout.obstacle_width)
+        self.reset()
+
+    def reset(self):
+        """Start a new game, reusing the obstacle pool"""
+        self.bird.__init__(self.layout.bird_x, self.layout.height // 2, self.layout.bird_size)
+        self.obstacles.clear()
+        self.score = 0
+        self.game_over = False
+        self.time = 0.0
+        self.spawn_timer = 0.0
+
+    def step(self, dt, pitch, volume, floor=REFERENCE_FLOOR, confidence=1.0):
+        """Advance dt milliseconds; returns (obstacles passed, collision)"""
+        bird = self.bird
+        self.control.move(bird, pitch, volume, floor, dt, confidence)
+        # Limit within screen boundaries
+        bird.y = max(bird.size, min(self.layout.height - bird.size, bird.y))
+
+        # Generate new obstacles
+        self.spawn_timer += dt
+        if self.spawn_timer > self.difficulty.spawn_interval:
+            margin = self.layout.gap_margin
+            gap_y = self.rng.randint(margin, self.layout.height - margin)
+            self.obstacles.spawn(self.layout.width, gap_y, self.difficulty.gap_size)
+            self.spawn_timer = 0
+
+        # Update obstacles, detect collision and passed obstacles near the bird
+        self.obstacles.update(dt)
+        passed, hit = self.obstacles.check(bird)
+        self.score += passed
+        if hit:
+            self.game_over = True
+        self.time += dt
+        return passed, hit
+
+
+# The trace, the bot and the batch simulator play the pitch-controlled variant
+PITCH = PitchControl()
+LAYOUT = PITCH.layout
+SCREEN_WIDTH = LAYOUT.width
+SCREEN_HEIGHT = LAYOUT.height
+BIRD_X = LAYOUT.bird_x
+BIRD_SIZE = LAYOUT.bird_size
+OBSTACLE_WIDTH = LAYOUT.obstacle_width
+GAP_MARGIN = LAYOUT.gap_margin
+
+
+class PitchTrace:
+    """Scripted input: (time_ms, pitch, volume, confidence) samples, held until the
+    next one; confidence defaults to 1"""
+
+    def __init__(self, times, pitches, volumes, confidences=None):
+        self.times = np.asarray(times, dtype=np.float64)
+        self.pitches = np.asarray(pitches, dtype=np.float64)
+        self.volumes = np.asarray(volumes, dtype=np.float64)
+        self.confidences = (np.ones_like(self.pitches) if confidences is None
+                            else np.asarray(confidences, dtype=np.float64))
+        self.duration = float(self.times[-1]) if len(self.times) else 0.0
+
+    def sample(self, t):
+        """(pitch, volume, confidence) at time t (scalar or array, in ms); loops after
+        the end"""
+        if self.duration > 0:
+            t = np.mod(t, self.duration)
+        index = np.clip(np.searchsorted(self.times, t, side='right') - 1, 0, len(self.times) - 1)
+        return self.pitches[index], self.volumes[index], self.confidences[index]
+
+    @classmethod
+    def load(cls, path):
+        """CSV with columns time_ms, pitch, volume and optionally confidence (header
+        optional)"""
+        rows = []
+        with open(path, newline='') as f:
+            for row in csv.reader(f):
+                try:
+                    rows.append([float(value) for value in row[:4]] + [1.0] * (4 - len(row)))
+                except ValueError:
+                    continue  # Header
+        times, pitches, volumes, confidences = zip(*rows)
+        return cls(times, pitches, volumes, confidences)
+
+    def save(self, path):
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['time_ms', 'pitch', 'volume', 'confidence'])
+            writer.writerows(zip(self.times.tolist(), self.pitches.tolist(),
+                                 self.volumes.tolist(), self.confidences.tolist()))
+
+    @classmethod
+    def from_audio(cls, spec, method='yin', window=1024, hop=256, seed=0):
+        """Run the game's own audio analysis over a WAV file or generated signal"""
+        from . import analysis
+        from .audio_capture import AudioCapture
+        from .audio_sources import open_source
+
+        source = open_source(spec, seed=seed)
+        results = []
+
+        class Collector:
+            def put(self, value):
+                results.append(value)
+
+        analysis.init_analysis(method, source.rate, window, hop)
+        capture = AudioCapture(analysis.analyze_audio, Collector(), window=window,
+                               hop=hop, source=source)
+        while True:
+            block = source.read(4096)
+            if len(block) == 0:
+                break
+            capture.feed(block, 0.0)
+        times = np.arange(1, len(results) + 1) * hop / source.rate * 1000
+        # Volumes are rescaled to the reference floor the thresholds were tuned for
+        pitches = [pitch for pitch, _, _, _, _ in results]
+        confidences = [confidence for _, confidence, _, _, _ in results]
+        volumes = [volume * REFERENCE_FLOOR / floor if floor else 0.0
+                   for _, _, volume, floor, _ in results]
+        return cls(times, pitches, volumes, confidences)
+
+
+def drift_step(drift, dt, wobble_ms, normal):
+    """Advance the pitch error of a singer: an Ornstein-Uhlenbeck process with unit
+    variance and time constant wobble_ms, so errors last instead of averaging out"""
+    keep = math.exp(-dt / wobble_ms)
+    return drift * keep + math.sqrt(1 - keep * keep) * normal
+
+
+class BatchBirdSim:
+    """n games at once; difficulty values may be scalars or arrays of length n.
+
+    Assumes obstacles are spaced further apart than the bird plus an obstacle
+    (speed * spawn_interval > OBSTACLE_WIDTH + 2 * BIRD_SIZE), so only the next
+    obstacle and the one just passed can touch the bird. Those two are kept in
+    flat arrays; obstacles further ahead wait in a per-game ring buffer."""
+
+    def __init__(self, n, difficulty=None, seed=None):
+        difficulty = difficulty or Difficulty()
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+        self.gap_size = np.broadcast_to(np.asarray(difficulty.gap_size, dtype=np.int64), (n,))
+        self.speed = np.broadcast_to(np.asarray(difficulty.speed, dtype=np.float64), (n,))
+        self.spawn_interval = np.broadcast_to(
+            np.asarray(difficulty.spawn_interval, dtype=np.float64), (n,))
+        spacing = (self.speed * self.spawn_interval / FRAME_MS).min()
+        if spacing <= OBSTACLE_WIDTH + 2 * BIRD_SIZE:
+            raise ValueError("obstacles too close together for the batch simulator")
+        self.slots = math.ceil(SCREEN_WIDTH / spacing) + 2
+
+        self.y = np.full(n, SCREEN_HEIGHT // 2, dtype=np.float64)
+        self.target_y = self.y.copy()
+        self.scroll = np.zeros(n)
+        self.spawn_timer = np.zeros(n)
+        self.time = np.zeros(n)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.over = np.zeros(n, dtype=bool)
+
+        # Obstacle x in world coordinates; no obstacle = infinitely far away
+        self.queue_x = np.zeros((n, self.slots))
+        self.queue_gap = np.zeros((n, self.slots))
+        self.spawned = np.zeros(n, dtype=np.int64)
+        self.next = np.zeros(n, dtype=np.int64)   # Number of obstacles passed
+        self.next_x = np.full(n, np.inf)
+        self.next_gap = np.full(n, SCREEN_HEIGHT / 2)
+        self.previous_x = np.full(n, -np.inf)
+        self.previous_gap = np.full(n, SCREEN_HEIGHT / 2)
+        self.half_gap = (self.gap_size // 2).astype(np.float64)
+
+    def _hits(self, obstacle_x, gap_y):
+        x = obstacle_x - self.scroll
+        overlap_x = (x < BIRD_X + BIRD_SIZE) & (x + OBSTACLE_WIDTH > BIRD_X - BIRD_SIZE)
+        outside = ((self.y - BIRD_SIZE < gap_y - self.half_gap) |
+                   (self.y + BIRD_SIZE > gap_y + self.half_gap))
+        return overlap_x & outside
+
+    def target_gap(self):
+        """Gap centre the bird is heading for: the one it is flying through, else the
+        next one (screen middle before the first obstacle)"""
+        clearing = self.previous_x + OBSTACLE_WIDTH - self.scroll >= BIRD_X - BIRD_SIZE
+        return np.where(clearing, self.previous_gap, self.next_gap)
+
+    def step(self, dt, pitch, volume, floor=REFERENCE_FLOOR, confidence=1.0):
+        """Advance every running game by dt ms; pitch, volume and confidence are arrays
+        of length n (or scalars). Returns (passed, hit) masks"""
+        running = ~self.over
+
+        # Bird (same rules as PitchControl.move)
+        active = running & (volume > relative_threshold(PITCH.MOVE_THRESHOLD, floor))
+        normalized_pitch = np.clip((pitch - PITCH_LOW) / (PITCH_HIGH - PITCH_LOW), 0, 1)
+        target_y = SCREEN_HEIGHT - 100 - normalized_pitch * (SCREEN_HEIGHT - 200)
+        if np.ndim(confidence) or confidence < PITCH.FULL_CONFIDENCE:
+            weight = np.asarray(confidence) / PITCH.FULL_CONFIDENCE
+            target_y = np.where(weight < 1, self.target_y + (target_y - self.target_y) * weight,
+                                target_y)
+        np.copyto(self.target_y, target_y, where=active & (pitch > 0))
+        self.y += (self.target_y - self.y) * (PITCH.response_factor(dt) * active)
+        np.clip(self.y, BIRD_SIZE, SCREEN_HEIGHT - BIRD_SIZE, out=self.y)
+
+        # Spawn
+        self.spawn_timer += dt * running
+        due = np.flatnonzero(self.spawn_timer > self.spawn_interval)
+        if due.size:
+            x = SCREEN_WIDTH + self.scroll[due]
+            gap = self.rng.integers(GAP_MARGIN, SCREEN_HEIGHT - GAP_MARGIN + 1, size=due.size)
+            slot = self.spawned[due] % self.slots
+            self.queue_x[due, slot] = x
+            self.queue_gap[due, slot] = gap
+            # Nothing left to pass: the new obstacle is the next one
+            first = self.next[due] == self.spawned[due]
+            self.next_x[due[first]] = x[first]
+            self.next_gap[due[first]] = gap[first]
+            self.spawned[due] += 1
+            self.spawn_timer[due] = 0
+
+        # Scroll, then test the next obstacle and the one just passed
+        self.scroll += self.speed * (dt / FRAME_MS * running)
+        hit = running & (self._hits(self.next_x, self.next_gap) |
+                         self._hits(self.previous_x, self.previous_gap))
+        passed = running & (self.next_x + OBSTACLE_WIDTH - self.scroll < BIRD_X)
+        done = np.flatnonzero(passed)
+        if done.size:
+            self.previous_x[done] = self.next_x[done]
+            self.previous_gap[done] = self.next_gap[done]
+            self.next[done] += 1
+            slot = self.next[done] % self.slots
+            waiting = self.next[done] < self.spawned[done]
+            self.next_x[done] = np.where(waiting, self.queue_x[done, slot], np.inf)
+            self.next_gap[done] = np.where(waiting, self.queue_gap[done, slot], SCREEN_HEIGHT / 2)
+            self.score[done] += 1
+        self.over |= hit
+        self.time += dt * running
+        return passed, hit
+
+
+def run_batch(n, difficulty, seed, trace=None, max_seconds=120.0, dt=FRAME_MS,
+              noise_cents=200.0, reaction_ms=250.0, wobble_ms=500.0):
+    """Play n games until all are over or max_seconds have passed, with the pitch
+    trace or else a bot: each game sings at the gap it is flying through, else the
+    next one (BatchBirdSim.target_gap), with a drifting pitch error of noise_cents
+    (drift_step) and reaction_ms late. Returns the simulator"""
+    sim = BatchBirdSim(n, difficulty, seed)
+    bot_rng = np.random.default_rng(None if seed is None else seed + 1)
+    delay = max(1, round(reaction_ms / dt))
+    pending = np.full((delay, n), y_to_pitch(SCREEN_HEIGHT // 2))  # Bot commands in flight
+    drift = np.zeros(n)
+    volume = np.full(n, 1000.0)
+    confidence = 1.0
+    # Traces start at a random offset in each game so games do not all sing in unison
+    offsets = bot_rng.uniform(0, trace.duration, n) if trace is not None else None
+    steps = round(max_seconds * 1000 / dt)
+    for step in range(steps):
+        if trace is not None:
+            pitch, volume, confidence = trace.sample(sim.time + offsets)
+        else:
+            drift = drift_step(drift, dt, wobble_ms, bot_rng.standard_normal(n))
+            pitch = pending[step % delay].copy()
+            pending[step % delay] = y_to_pitch(sim.target_gap()) * 2 ** (drift * noise_cents / 1200)
+        sim.step(dt, pitch, volume, confidence=confidence)
+        if sim.over.all():
+            break
+    return sim
+
+
+class ReplayGaps:
+    """Stands in for BatchBirdSim.rng: hands out the gaps a BirdGame drew"""
+
+    def __init__(self, gaps):
+        self.gaps = gaps
+
+    def integers(self, low, high, size):
+        return np.array([self.gaps.popleft() for _ in range(size)])
+
+
+class RecordingRandom(random.Random):
+    """random.Random that remembers the gaps (randint results) it drew"""
+
+    def __init__(self, seed):
+        super().__init__(seed)
+        self.drawn = deque()
+
+    def randint(self, a, b):
+        value = super().randint(a, b)
+        self.drawn.append(value)
+        return value
+
+
+def check_equivalence(seed, difficulty=None, max_seconds=60.0, dt=FRAME_MS):
+    """Play one BirdGame and a one-game BatchBirdSim in lockstep with the same gaps
+    and seeded random notes (pitch, confidence and silences); returns None while they
+    agree up to the first collision, else a description of the first difference"""
+    difficulty = difficulty or PITCH.difficulty()
+    rng = RecordingRandom(seed)
+    game = BirdGame(rng, difficulty)
+    sim = BatchBirdSim(1, difficulty)
+    sim.rng = ReplayGaps(rng.drawn)
+    notes = random.Random(seed + 1)
+    pitch, volume, confidence = 0.0, 0.0, 1.0
+    for step in range(round(max_seconds * 1000 / dt)):
+        if step % 24 == 0:  # A new note (or a silence) every 24 steps
+            pitch = notes.uniform(100, 700) if notes.random() < 0.9 else 0.0
+            volume = 1000.0 if notes.random() < 0.9 else 0.0
+            confidence = notes.choice([1.0, notes.uniform(0.1, 1.0)])
+        passed, hit = game.step(dt, pitch, volume, confidence=confidence)
+        batch_passed, batch_hit = sim.step(dt, np.array([pitch]), np.array([volume]),
+                                           confidence=np.array([confidence]))
+        if (game.bird.y != sim.y[0] or passed != int(batch_passed[0])
+                or hit != bool(batch_hit[0])):
+            return {'seed': seed, 'step': step, 'game': [game.bird.y, passed, hit],
+                    'batch': [float(sim.y[0]), bool(batch_passed[0]), bool(batch_hit[0])]}
+        if hit:
+            break
+    return None
+
+
+def summarize(sim, games, difficulty, max_seconds):
+    """Score and survival statistics of the games selected by games (a slice)"""
+    score = sim.score[games]
+    return dict(difficulty.as_dict(), **{
+        'games': len(score),
+        'mean_score': float(score.mean()),
+        'p10_score': float(np.percentile(score, 10)),
+        'p50_score': float(np.percentile(score, 50)),
+        'p90_score': float(np.percentile(score, 90)),
+        'mean_survival_s': float(sim.time[games].mean() / 1000),
+        'survived_rate': float(np.mean(~sim.over[games])),
+    })
+
+
+def parse_list(text, kind):
+    return [kind(value) for value in text.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless voice bird simulation and "
+                                                 "difficulty sweep")
+    parser.add_argument("--games", type=int, default=4096, help="games per setting")
+    parser.add_argument("--gap-size", default="380", help="comma-separated gap sizes (px)")
+    parser.add_argument("--speed", default="2.8", help="comma-separated speeds (px per frame)")
+    parser.add_argument("--spawn-interval", default="2700",
+                        help="comma-separated spawn intervals (ms)")
+    parser.add_argument("--trace", help="pitch trace CSV (time_ms,pitch,volume) instead of the bot")
+    parser.add_argument("--trace-from", help="build the trace by analysing an audio input "
+                                             "(WAV file, sine:HZ, chirp:A:B, noise)")
+    parser.add_argument("--save-trace", help="write the trace used to a CSV file")
+    parser.add_argument("--noise", type=float, default=200.0,
+                        help="bot pitch error in cents (standard deviation)")
+    parser.add_argument("--wobble", type=float, default=500.0,
+                        help="how long a bot pitch error lasts, in ms")
+    parser.add_argument("--reaction", type=float, default=250.0, help="bot reaction time in ms")
+    parser.add_argument("--max-seconds", type=float, default=120.0, help="game length limit")
+    parser.add_argument("--dt", type=float, default=FRAME_MS, help="time step in ms")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", type=int, metavar="SEEDS",
+                        help="instead of a sweep, check that BatchBirdSim plays exactly like "
+                             "BirdGame for this many seeds (exit status 1 if not)")
+    args = parser.parse_args()
+
+    if args.check:
+        setting = Difficulty(*(parse_list(value, kind)[0] for value, kind in (
+            (args.gap_size, int), (args.speed, float), (args.spawn_interval, float))))
+        mismatches = [result for result in (
+            check_equivalence(seed, setting, args.max_seconds, args.dt)
+            for seed in range(args.seed, args.seed + args.check)) if result]
+        print(json.dumps({'seeds': args.check, 'mismatches': mismatches}, indent=2))
+        raise SystemExit(1 if mismatches else 0)
+
+    trace = None
+    if args.trace:
+        trace = PitchTrace.load(args.trace)
+    elif args.trace_from:
+        trace = PitchTrace.from_audio(args.trace_from, seed=args.seed)
+    if trace is not None and args.save_trace:
+        trace.save(args.save_trace)
+
+    # Every setting gets args.games consecutive games of one big batch
+    settings = [Difficulty(gap_size, speed, spawn_interval) for gap_size, speed, spawn_interval
+                in itertools.product(parse_list(args.gap_size, int), parse_list(args.speed, float),
+                                     parse_list(args.spawn_interval, float))]
+    difficulty = Difficulty(*(np.repeat([getattr(setting, name) for setting in settings],
+                                        args.games)
+                              for name in ('gap_size', 'speed', 'spawn_interval')))
+    start = time.perf_counter()
+    sim = run_batch(len(settings) * args.games, difficulty, args.seed, trace, args.max_seconds,
+                    args.dt, args.noise, args.reaction, args.wobble)
+    elapsed = time.perf_counter() - start
+    results = [summarize(sim, slice(i * args.games, (i + 1) * args.games), setting,
+                         args.max_seconds)
+               for i, setting in enumerate(settings)]
+
+    print(json.dumps({
+        'input': 'trace' if trace is not None else
+                 {'bot': {'noise_cents': args.noise, 'reaction_ms': args.reaction,
+                          'wobble_ms': args.wobble}},
+        'dt_ms': args.dt,
+        'max_seconds': args.max_seconds,
+        'games_per_sec': sim.n / elapsed if elapsed else 0.0,
+        'results': results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
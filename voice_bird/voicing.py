@@ -0,0 +1,97 @@
+import math
+import time
+
+import numpy as np
+
+from .noise_floor import MIN_FLOOR
+
+# Cheap first stage in front of pitch detection.
+# Loud background noise (an arcade, a fan, traffic) passes the volume gate just as
+# well as a voice, and used to cost a full pitch analysis per window. Each window
+# that passes the gate is first classified from three inexpensive features:
+#
+#   zero-crossing rate  hiss and white noise cross zero on about half the samples,
+#                       a voice (80-1000 Hz with harmonics) on a few percent; high
+#                       rates are rejected before any FFT is taken
+#   spectral flatness   geometric / arithmetic mean of the power spectrum (80 Hz to
+#                       5 kHz, one real FFT of the Hann-windowed frame): near 0 for
+#                       the harmonic peaks of a voice, 0.2 and up for pink or white
+#                       noise
+#   energy delta        a rise of ONSET_DB or more since the previous window marks an
+#                       onset; the attack of a note is noisier than its steady part,
+#                       so onset windows are allowed a flatter spectrum
+#
+# Windows below the gate are 'silence', windows failing the tests 'noise', and only
+# 'voiced' windows go on to the pitch detector. The clarity of a voiced window
+# (1 at a perfectly harmonic spectrum, 0 at the flatness limit) is the confidence
+# the bird gets with the pitch. The zero-crossing test costs a few microseconds,
+# the flatness test one real FFT of the window (a quarter of a YIN analysis or
+# less); the arrays are allocated once, only the FFT result is new.
+
+SILENCE, NOISE, VOICED = 'silence', 'noise', 'voiced'
+CLASSES = (SILENCE, NOISE, VOICED)
+
+ZCR_MAX = 0.35              # Zero crossings per sample
+FLATNESS_MAX = 0.15
+ONSET_DB = 9.0              # Level rise since the previous window
+ONSET_FLATNESS_MAX = 0.2
+BAND_LOW = 80               # Hz, spectral flatness band
+BAND_HIGH = 5000
+
+
+class VoicingDetector:
+    """Classifies a window as silence, noise or voiced: (class, clarity)"""
+
+    def __init__(self, rate, chunk, band_low=BAND_LOW, band_high=BAND_HIGH):
+        self.window = np.hanning(chunk).astype(np.float32)
+        self.windowed = np.zeros(chunk, dtype=np.float32)
+        self.signs = np.zeros(chunk, dtype=bool)
+        self.changes = np.zeros(chunk - 1, dtype=bool)
+        self.low = max(1, int(band_low * chunk / rate))
+        self.high = min(chunk // 2 + 1, int(band_high * chunk / rate) + 1)
+        self.power = np.zeros(self.high - self.low)
+        self.scratch = np.zeros(self.high - self.low)
+        self.previous_db = None
+        self.counts = dict.fromkeys(CLASSES, 0)
+        self.total_time = 0.0
+
+    def flatness(self, frame):
+        """Spectral flatness of the Hann-windowed frame over the band"""
+        np.multiply(frame, self.window, out=self.windowed)
+        band = np.fft.rfft(self.windowed)[self.low:self.high]
+        power = np.abs(band, out=self.power)
+        np.square(power, out=power)
+        power += 1e-9
+        count = len(power)
+        log_mean = np.log(power, out=self.scratch).sum() / count
+        return math.exp(log_mean) / (power.sum() / count)
+
+    def classify(self, frame, volume, gate):
+        level_db = 20 * math.log10(max(volume, MIN_FLOOR))
+        onset = self.previous_db is not None and level_db - self.previous_db >= ONSET_DB
+        self.previous_db = level_db
+        if volume <= gate:
+            return SILENCE, 0.0
+        np.signbit(frame, out=self.signs)
+        np.not_equal(self.signs[1:], self.signs[:-1], out=self.changes)
+        if np.count_nonzero(self.changes) > ZCR_MAX * len(self.changes):
+            return NOISE, 0.0
+        limit = ONSET_FLATNESS_MAX if onset else FLATNESS_MAX
+        flatness = self.flatness(frame)
+        if flatness >= limit:
+            return NOISE, 0.0
+        return VOICED, float(1 - flatness / limit)
+
+    def __call__(self, frame, volume, gate):
+        """Classify one float32 window whose RMS volume is compared against gate"""
+        start = time.perf_counter()
+        kind, clarity = self.classify(frame, volume, gate)
+        self.total_time += time.perf_counter() - start
+        self.counts[kind] += 1
+        return kind, clarity
+
+    def stats(self):
+        """Windows per class and the mean cost per window in microseconds"""
+        windows = sum(self.counts.values())
+        return dict(self.counts, windows=windows,
+                    mean_us=self.total_time / windows * 1e6 if windows else 0.0)